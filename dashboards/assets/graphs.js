@@ -0,0 +1,104 @@
+/*
+Modern Data Warehouse - Business Dashboard Figures
+==================================================
+Builds the dashboard's Plotly figures in the browser from the pre-aggregated
+tables the server writes to the 'agg-store' component.
+*/
+
+function salesTrendFigure(daily) {
+    return {
+        data: [{
+            type: 'scattergl', mode: 'lines',
+            x: daily.order_date, y: daily.sales_amount, line: {color: '#2E86AB'}
+        }],
+        layout: {
+            title: {text: 'Daily Sales Trend'},
+            xaxis: {title: {text: 'order_date'}},
+            yaxis: {title: {text: 'sales_amount'}}
+        }
+    };
+}
+
+function countrySalesFigure(countries) {
+    // Rows arrive largest first; reverse so the largest bar is drawn on top
+    return {
+        data: [{
+            type: 'bar', orientation: 'h',
+            x: countries.sales_amount.slice().reverse(),
+            y: countries.country.slice().reverse(),
+            marker: {color: '#A23B72'}
+        }],
+        layout: {
+            title: {text: 'Sales by Country'},
+            xaxis: {title: {text: 'sales_amount'}},
+            yaxis: {title: {text: 'country'}}
+        }
+    };
+}
+
+function topProductsFigure(products) {
+    return {
+        data: [{
+            type: 'bar', x: products.product_name, y: products.total_sales,
+            marker: {color: '#F18F01'}
+        }],
+        layout: {
+            title: {text: 'Top 10 Products by Sales'},
+            xaxis: {title: {text: 'product_name'}, tickangle: 45},
+            yaxis: {title: {text: 'total_sales'}}
+        }
+    };
+}
+
+function demographicsFigure(demo) {
+    // Hierarchy arrays are rolled up server-side
+    return {
+        data: [{
+            type: 'sunburst', branchvalues: 'total', ids: demo.ids,
+            labels: demo.labels, parents: demo.parents, values: demo.values
+        }],
+        layout: {title: {text: 'Customer Demographics'}}
+    };
+}
+
+function categoryFigure(categories) {
+    return {
+        data: [
+            {type: 'bar', name: 'Sales', x: categories.category, y: categories.total_sales,
+             marker: {color: '#2E86AB'}, xaxis: 'x', yaxis: 'y'},
+            {type: 'bar', name: 'Quantity', x: categories.category, y: categories.total_quantity,
+             marker: {color: '#A23B72'}, xaxis: 'x2', yaxis: 'y2'}
+        ],
+        layout: {
+            title: {text: 'Category Performance'},
+            showlegend: false,
+            xaxis: {domain: [0, 0.45], anchor: 'y'},
+            yaxis: {anchor: 'x'},
+            xaxis2: {domain: [0.55, 1], anchor: 'y2'},
+            yaxis2: {anchor: 'x2'},
+            annotations: [
+                {text: 'Sales by Category', x: 0.225, y: 1, xref: 'paper', yref: 'paper',
+                 xanchor: 'center', yanchor: 'bottom', showarrow: false},
+                {text: 'Quantity by Category', x: 0.775, y: 1, xref: 'paper', yref: 'paper',
+                 xanchor: 'center', yanchor: 'bottom', showarrow: false}
+            ]
+        }
+    };
+}
+
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    graphs: {
+        render: function(data) {
+            if (!data) {
+                return [{}, {}, {}, {}, {}];
+            }
+            return [
+                data.daily_sales ? salesTrendFigure(data.daily_sales) : {},
+                data.country_sales ? countrySalesFigure(data.country_sales) : {},
+                data.top_products ? topProductsFigure(data.top_products) : {},
+                data.demographics ? demographicsFigure(data.demographics) : {},
+                data.category_perf ? categoryFigure(data.category_perf) : {}
+            ];
+        }
+    }
+});
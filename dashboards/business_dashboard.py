@@ -5,12 +5,13 @@ Creates interactive business dashboards using Plotly Dash for data visualization
 """
 
 import sys
+import numpy as np
 import pandas as pd
-import plotly.express as px
 import plotly.graph_objects as go
-from plotly.subplots import make_subplots
 from datetime import datetime, timedelta
 from pathlib import Path
+from typing import Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
 import logging
 
 # Add the project root to Python path
@@ -19,13 +20,38 @@ sys.path.append(str(project_root))
 
 try:
     import dash
-    from dash import dcc, html, Input, Output, callback
+    from dash import dcc, html, Input, Output, ClientsideFunction, callback
     import dash_bootstrap_components as dbc
     DASH_AVAILABLE = True
 except ImportError:
     DASH_AVAILABLE = False
     print("Dash not available. Install with: pip install dash dash-bootstrap-components")
 
+try:
+    import jinja2
+    JINJA2_AVAILABLE = True
+except ImportError:
+    JINJA2_AVAILABLE = False
+
+try:
+    from flask_caching import Cache
+    CACHE_AVAILABLE = True
+except ImportError:
+    CACHE_AVAILABLE = False
+
+# Cached query results and figures live as long as one refresh interval
+CACHE_TIMEOUT = 300
+
+# Static report template, compiled once at import
+REPORT_TEMPLATE = (jinja2.Environment(
+    loader=jinja2.FileSystemLoader(str(Path(__file__).parent / 'templates')),
+    autoescape=True
+).get_template('business_report.html') if JINJA2_AVAILABLE else None)
+
+# Low-cardinality dimension attributes kept as pandas categoricals
+CATEGORICAL_COLUMNS = ('country', 'gender', 'marital_status', 'category',
+                       'subcategory', 'product_line', 'product_name')
+
 from pipelines.config.database import db_manager
 
 class BusinessDashboard:
@@ -34,97 +60,254 @@ class BusinessDashboard:
     def __init__(self):
         self.logger = logging.getLogger(__name__)
         self.db = db_manager
+        self.cache = None
+        
+        # Outputs of the last refresh and the fact table state they were built from
+        self._last_signature = None
+        self._last_outputs = None
         
         if DASH_AVAILABLE:
             self.app = dash.Dash(__name__, external_stylesheets=[dbc.themes.BOOTSTRAP])
+            self._setup_cache()
             self.setup_layout()
             self.setup_callbacks()
     
+    def _setup_cache(self):
+        """Memoize Gold layer queries and figures so repeat loads skip the database"""
+        if not CACHE_AVAILABLE:
+            return
+        
+        self.cache = Cache(self.app.server, config={
+            'CACHE_TYPE': 'SimpleCache',
+            'CACHE_DEFAULT_TIMEOUT': CACHE_TIMEOUT
+        })
+        
+        # Only the raising query methods are memoized; the public getters log and fall back
+        # outside the cache, so a transient database error is never stored as a result
+        for name in ('_query_sales_data', '_query_kpis', '_query_daily_sales', '_query_country_sales',
+                     '_query_customer_summary', '_query_product_performance',
+                     '_query_category_performance', '_build_dashboard_outputs'):
+            setattr(self, name, self.cache.memoize(timeout=CACHE_TIMEOUT)(getattr(self, name)))
+    
+    def invalidate_cache(self):
+        """Drop cached query results and figures, e.g. after a new ETL run completes"""
+        if self.cache:
+            self.cache.clear()
+    
+    def _categorize(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Convert dimension attribute columns to category dtype"""
+        for column in CATEGORICAL_COLUMNS:
+            if column in df.columns:
+                df[column] = df[column].astype('category')
+        return df
+    
+    def _query_frame(self, query: str, date_columns: tuple = ()) -> pd.DataFrame:
+        """Run a query and build a DataFrame column-wise from its streamed result"""
+        columns = {}
+        for chunk in self.db.execute_query_iter(query):
+            for column, values in chunk.items():
+                columns.setdefault(column, []).extend(values)
+        
+        for column in date_columns:
+            if column in columns:
+                columns[column] = np.asarray(columns[column], dtype='datetime64[ns]')
+        return self._categorize(pd.DataFrame(columns))
+    
     def get_sales_data(self) -> pd.DataFrame:
-        """Get sales data from the Gold layer"""
+        """Get row-level sales data for the last 30 days from the Gold layer"""
         try:
-            query = """
-            SELECT 
-                f.order_date,
-                f.sales_amount,
-                f.quantity,
-                f.price,
-                c.first_name + ' ' + c.last_name as customer_name,
-                c.country,
-                c.gender,
-                c.marital_status,
-                p.product_name,
-                p.category,
-                p.subcategory,
-                p.product_line
-            FROM gold.fact_sales f
-            LEFT JOIN gold.dim_customers c ON f.customer_key = c.customer_key
-            LEFT JOIN gold.dim_products p ON f.product_key = p.product_key
-            WHERE f.order_date IS NOT NULL
-            ORDER BY f.order_date DESC
-            """
-            
-            results = self.db.execute_query(query)
-            if results:
-                df = pd.DataFrame(results)
-                df['order_date'] = pd.to_datetime(df['order_date'])
-                return df
-            else:
-                return pd.DataFrame()
-                
+            return self._query_sales_data()
         except Exception as e:
             self.logger.error(f"Error fetching sales data: {str(e)}")
             return pd.DataFrame()
     
-    def get_customer_summary(self) -> pd.DataFrame:
-        """Get customer summary statistics"""
+    def _query_sales_data(self) -> pd.DataFrame:
+        """Query row-level sales for the last 30 days"""
+        query = """
+        SELECT 
+            f.order_date,
+            f.sales_amount,
+            f.quantity,
+            f.price,
+            f.customer_key,
+            c.country,
+            c.gender,
+            c.marital_status,
+            p.product_name,
+            p.category,
+            p.subcategory,
+            p.product_line
+        FROM gold.fact_sales f
+        LEFT JOIN gold.dim_customers c ON f.customer_key = c.customer_key
+        LEFT JOIN gold.dim_products p ON f.product_key = p.product_key
+        WHERE f.order_date IS NOT NULL
+        AND f.order_date >= DATEADD(day, -30, GETDATE())
+        """
+        
+        return self._query_frame(query, date_columns=('order_date',))
+    
+    def get_data_signature(self) -> Optional[tuple]:
+        """Get a cheap (latest order date, row count) fingerprint of the fact table"""
         try:
             query = """
             SELECT 
-                c.country,
-                c.gender,
-                c.marital_status,
-                COUNT(*) as customer_count,
-                AVG(CAST(f.sales_amount as FLOAT)) as avg_sales
-            FROM gold.dim_customers c
-            LEFT JOIN gold.fact_sales f ON c.customer_key = f.customer_key
-            GROUP BY c.country, c.gender, c.marital_status
-            ORDER BY customer_count DESC
+                MAX(order_date) as max_order_date,
+                COUNT(*) as row_count
+            FROM gold.fact_sales
             """
             
             results = self.db.execute_query(query)
-            return pd.DataFrame(results) if results else pd.DataFrame()
+            return (results[0]['max_order_date'], results[0]['row_count']) if results else None
             
+        except Exception as e:
+            self.logger.error(f"Error fetching data signature: {str(e)}")
+            return None
+    
+    def get_kpis(self) -> Dict[str, Any]:
+        """Get headline sales KPIs for the last 30 days"""
+        try:
+            return self._query_kpis()
+        except Exception as e:
+            self.logger.error(f"Error fetching sales KPIs: {str(e)}")
+            return {}
+    
+    def _query_kpis(self) -> Dict[str, Any]:
+        """Query the 30-day KPI totals"""
+        query = """
+        SELECT 
+            SUM(sales_amount) as total_sales,
+            COUNT(*) as total_orders,
+            COUNT(DISTINCT customer_key) as total_customers,
+            CAST(SUM(sales_amount) as FLOAT) / NULLIF(COUNT(sales_amount), 0) as avg_order_value
+        FROM gold.fact_sales
+        WHERE order_date >= DATEADD(day, -30, GETDATE())
+        """
+        
+        results = self.db.execute_query(query)
+        return results[0] if results else {}
+    
+    def get_daily_sales(self) -> pd.DataFrame:
+        """Get total sales per day"""
+        try:
+            return self._query_daily_sales()
+        except Exception as e:
+            self.logger.error(f"Error fetching daily sales: {str(e)}")
+            return pd.DataFrame()
+    
+    def _query_daily_sales(self) -> pd.DataFrame:
+        """Query daily sales totals"""
+        query = """
+        SELECT 
+            order_date,
+            SUM(sales_amount) as sales_amount
+        FROM gold.fact_sales
+        WHERE order_date IS NOT NULL
+        GROUP BY order_date
+        ORDER BY order_date
+        """
+        
+        return self._query_frame(query, date_columns=('order_date',))
+    
+    def get_country_sales(self) -> pd.DataFrame:
+        """Get total sales for the top 10 countries"""
+        try:
+            return self._query_country_sales()
+        except Exception as e:
+            self.logger.error(f"Error fetching country sales: {str(e)}")
+            return pd.DataFrame()
+    
+    def _query_country_sales(self) -> pd.DataFrame:
+        """Query the top 10 countries by sales"""
+        query = """
+        SELECT TOP 10
+            c.country,
+            SUM(f.sales_amount) as sales_amount
+        FROM gold.fact_sales f
+        LEFT JOIN gold.dim_customers c ON f.customer_key = c.customer_key
+        WHERE f.order_date IS NOT NULL
+        GROUP BY c.country
+        ORDER BY sales_amount DESC
+        """
+        
+        return self._query_frame(query)
+    
+    def get_customer_summary(self) -> pd.DataFrame:
+        """Get customer summary statistics"""
+        try:
+            return self._query_customer_summary()
         except Exception as e:
             self.logger.error(f"Error fetching customer summary: {str(e)}")
             return pd.DataFrame()
     
+    def _query_customer_summary(self) -> pd.DataFrame:
+        """Query customer counts and average sales per demographic"""
+        query = """
+        SELECT 
+            c.country,
+            c.gender,
+            c.marital_status,
+            COUNT(*) as customer_count,
+            CAST(SUM(f.sales_amount) as FLOAT) / NULLIF(COUNT(f.sales_amount), 0) as avg_sales
+        FROM gold.dim_customers c
+        LEFT JOIN gold.fact_sales f ON c.customer_key = f.customer_key
+        GROUP BY c.country, c.gender, c.marital_status
+        ORDER BY customer_count DESC
+        """
+        
+        return self._query_frame(query)
+    
     def get_product_performance(self) -> pd.DataFrame:
-        """Get product performance metrics"""
+        """Get performance metrics for the top 10 products"""
         try:
-            query = """
-            SELECT 
-                p.product_name,
-                p.category,
-                p.subcategory,
-                p.product_line,
-                COUNT(*) as order_count,
-                SUM(f.sales_amount) as total_sales,
-                SUM(f.quantity) as total_quantity,
-                AVG(CAST(f.sales_amount as FLOAT)) as avg_order_value
-            FROM gold.fact_sales f
-            LEFT JOIN gold.dim_products p ON f.product_key = p.product_key
-            GROUP BY p.product_name, p.category, p.subcategory, p.product_line
-            ORDER BY total_sales DESC
-            """
-            
-            results = self.db.execute_query(query)
-            return pd.DataFrame(results) if results else pd.DataFrame()
-            
+            return self._query_product_performance()
         except Exception as e:
             self.logger.error(f"Error fetching product performance: {str(e)}")
             return pd.DataFrame()
     
+    def _query_product_performance(self) -> pd.DataFrame:
+        """Query the top 10 products by sales"""
+        query = """
+        SELECT TOP 10
+            p.product_name,
+            p.category,
+            p.subcategory,
+            p.product_line,
+            COUNT(*) as order_count,
+            SUM(f.sales_amount) as total_sales,
+            SUM(f.quantity) as total_quantity,
+            CAST(SUM(f.sales_amount) as FLOAT) / NULLIF(COUNT(f.sales_amount), 0) as avg_order_value
+        FROM gold.fact_sales f
+        LEFT JOIN gold.dim_products p ON f.product_key = p.product_key
+        GROUP BY p.product_name, p.category, p.subcategory, p.product_line
+        ORDER BY total_sales DESC
+        """
+        
+        return self._query_frame(query)
+    
+    def get_category_performance(self) -> pd.DataFrame:
+        """Get sales and quantity totals per product category"""
+        try:
+            return self._query_category_performance()
+        except Exception as e:
+            self.logger.error(f"Error fetching category performance: {str(e)}")
+            return pd.DataFrame()
+    
+    def _query_category_performance(self) -> pd.DataFrame:
+        """Query sales and quantity totals per category"""
+        query = """
+        SELECT 
+            p.category,
+            COUNT(*) as order_count,
+            SUM(f.sales_amount) as total_sales,
+            SUM(f.quantity) as total_quantity
+        FROM gold.fact_sales f
+        LEFT JOIN gold.dim_products p ON f.product_key = p.product_key
+        GROUP BY p.category
+        ORDER BY total_sales DESC
+        """
+        
+        return self._query_frame(query)
+    
     def setup_layout(self):
         """Setup the dashboard layout"""
         if not DASH_AVAILABLE:
@@ -157,7 +340,7 @@ class BusinessDashboard:
                         dbc.CardBody([
                             html.H4("Orders", className="card-title"),
                             html.H2(id="total-orders", className="text-success"),
-                            html.P("Total count", className="text-muted")
+                            html.P("Last 30 days", className="text-muted")
                         ])
                     ], color="light")  
                 ], width=3),
@@ -167,7 +350,7 @@ class BusinessDashboard:
                         dbc.CardBody([
                             html.H4("Customers", className="card-title"),
                             html.H2(id="total-customers", className="text-info"),
-                            html.P("Unique customers", className="text-muted")
+                            html.P("Unique, last 30 days", className="text-muted")
                         ])
                     ], color="light")
                 ], width=3),
@@ -237,6 +420,9 @@ class BusinessDashboard:
                 ], width=12)
             ], className="mb-4"),
             
+            # Pre-aggregated chart data rendered client-side
+            dcc.Store(id='agg-store'),
+            
             # Auto-refresh component
             dcc.Interval(
                 id='interval-component',
@@ -267,99 +453,132 @@ class BusinessDashboard:
              Output('total-orders', 'children'),
              Output('total-customers', 'children'),
              Output('avg-order-value', 'children'),
-             Output('sales-trend-chart', 'figure'),
-             Output('sales-by-country-chart', 'figure'),
-             Output('top-products-chart', 'figure'),
-             Output('customer-demographics-chart', 'figure'),
-             Output('category-performance-chart', 'figure'),
+             Output('agg-store', 'data'),
              Output('last-updated', 'children')],
             [Input('interval-component', 'n_intervals')]
         )
         def update_dashboard(n):
-            # Get data
-            sales_df = self.get_sales_data()
-            customer_df = self.get_customer_summary()
-            product_df = self.get_product_performance()
-            
-            if sales_df.empty:
-                # Return empty/default values if no data
-                return ("No data", "No data", "No data", "No data", 
-                       {}, {}, {}, {}, {}, 
-                       f"Last updated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-            
-            # Calculate KPIs
-            total_sales = f"${sales_df['sales_amount'].sum():,.0f}"
-            total_orders = f"{len(sales_df):,}"
-            total_customers = f"{sales_df['customer_name'].nunique():,}"
-            avg_order = f"${sales_df['sales_amount'].mean():.2f}"
-            
-            # Sales trend chart
-            daily_sales = sales_df.groupby(sales_df['order_date'].dt.date)['sales_amount'].sum().reset_index()
-            sales_trend_fig = px.line(daily_sales, x='order_date', y='sales_amount',
-                                    title="Daily Sales Trend")
-            sales_trend_fig.update_traces(line_color='#2E86AB')
-            
-            # Sales by country chart
-            country_sales = sales_df.groupby('country')['sales_amount'].sum().reset_index()
-            country_sales = country_sales.sort_values('sales_amount', ascending=True).tail(10)
-            sales_by_country_fig = px.bar(country_sales, x='sales_amount', y='country',
-                                        orientation='h', title="Sales by Country")
-            sales_by_country_fig.update_traces(marker_color='#A23B72')
+            last_updated = f"Last updated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
             
-            # Top products chart
-            if not product_df.empty:
-                top_products = product_df.head(10)
-                top_products_fig = px.bar(top_products, x='product_name', y='total_sales',
-                                        title="Top 10 Products by Sales")
-                top_products_fig.update_traces(marker_color='#F18F01')
-                top_products_fig.update_xaxes(tickangle=45)
-            else:
-                top_products_fig = {}
+            # Skip the refresh entirely while no new sales data has landed
+            signature = self.get_data_signature()
+            if signature is not None and signature == self._last_signature:
+                return self._last_outputs + (last_updated,)
             
-            # Customer demographics chart
-            if not customer_df.empty:
-                demographics_fig = px.sunburst(customer_df, 
-                                             path=['country', 'gender', 'marital_status'],
-                                             values='customer_count',
-                                             title="Customer Demographics")
-            else:
-                demographics_fig = {}
+            if self._last_signature is not None:
+                self.invalidate_cache()
             
-            # Category performance chart
-            if not product_df.empty:
-                category_perf = product_df.groupby('category').agg({
-                    'total_sales': 'sum',
-                    'total_quantity': 'sum',
-                    'order_count': 'sum'
-                }).reset_index()
-                
-                category_fig = make_subplots(
-                    rows=1, cols=2,
-                    subplot_titles=("Sales by Category", "Quantity by Category"),
-                    specs=[[{"type": "bar"}, {"type": "bar"}]]
-                )
-                
-                category_fig.add_trace(
-                    go.Bar(x=category_perf['category'], y=category_perf['total_sales'],
-                          name="Sales", marker_color='#2E86AB'),
-                    row=1, col=1
-                )
-                
-                category_fig.add_trace(
-                    go.Bar(x=category_perf['category'], y=category_perf['total_quantity'],
-                          name="Quantity", marker_color='#A23B72'),
-                    row=1, col=2
-                )
-                
-                category_fig.update_layout(showlegend=False, title_text="Category Performance")
-            else:
-                category_fig = {}
-            
-            last_updated = f"Last updated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+            try:
+                outputs = self._build_dashboard_outputs(n)
+            except Exception as e:
+                # Nothing was cached; the next tick retries the queries
+                self.logger.error(f"Error refreshing dashboard: {str(e)}")
+                fallback = self._last_outputs or ("No data", "No data", "No data", "No data", None)
+                return fallback + (last_updated,)
             
-            return (total_sales, total_orders, total_customers, avg_order,
-                   sales_trend_fig, sales_by_country_fig, top_products_fig,
-                   demographics_fig, category_fig, last_updated)
+            self._last_signature = signature
+            self._last_outputs = outputs
+            return outputs + (last_updated,)
+        
+        # Figures are built in the browser from the aggregates (see assets/graphs.js)
+        self.app.clientside_callback(
+            ClientsideFunction(namespace='graphs', function_name='render'),
+            [Output('sales-trend-chart', 'figure'),
+             Output('sales-by-country-chart', 'figure'),
+             Output('top-products-chart', 'figure'),
+             Output('customer-demographics-chart', 'figure'),
+             Output('category-performance-chart', 'figure')],
+            [Input('agg-store', 'data')]
+        )
+    
+    def _compute_aggregates(self, strict: bool = False) -> Dict[str, Any]:
+        """Fetch every Gold layer aggregate used by the dashboard and static report"""
+        # With strict, a failed query raises instead of falling back to empty data
+        prefix = '_query_' if strict else 'get_'
+        sources = {
+            'kpis': 'kpis',
+            'daily_sales': 'daily_sales',
+            'country_sales': 'country_sales',
+            'customer_df': 'customer_summary',
+            'product_df': 'product_performance',
+            'category_perf': 'category_performance'
+        }
+        getters = {name: getattr(self, prefix + source) for name, source in sources.items()}
+        
+        # Aggregated server-side, queries run concurrently on pooled connections
+        with ThreadPoolExecutor(max_workers=len(getters)) as executor:
+            futures = {name: executor.submit(getter) for name, getter in getters.items()}
+            return {name: future.result() for name, future in futures.items()}
+    
+    def _format_kpis(self, kpis: Dict[str, Any]) -> tuple:
+        """Format KPI values for display"""
+        return (f"${kpis.get('total_sales') or 0:,.0f}",
+                f"{kpis.get('total_orders') or 0:,}",
+                f"{kpis.get('total_customers') or 0:,}",
+                f"${kpis.get('avg_order_value') or 0:.2f}")
+    
+    def _build_dashboard_outputs(self, n):
+        """Build KPI values and chart aggregates for one refresh tick, shared by all viewers"""
+        data = self._compute_aggregates(strict=True)
+        daily_sales = data['daily_sales']
+        
+        if daily_sales.empty:
+            # Return empty/default values if no data
+            return ("No data", "No data", "No data", "No data", None)
+        
+        # Format dates straight from the datetime64 values, no per-row Python date objects
+        daily_sales = daily_sales.assign(
+            order_date=np.datetime_as_string(daily_sales['order_date'].to_numpy(), unit='D')
+        )
+        
+        # Small column-oriented tables the browser turns into figures
+        aggregates = {
+            'daily_sales': self._to_columns(daily_sales, ['order_date', 'sales_amount']),
+            'country_sales': self._to_columns(data['country_sales'], ['country', 'sales_amount']),
+            'top_products': self._to_columns(data['product_df'], ['product_name', 'total_sales']),
+            'demographics': self._sunburst_hierarchy(data['customer_df'],
+                                                     ['country', 'gender', 'marital_status'],
+                                                     'customer_count'),
+            'category_perf': self._to_columns(data['category_perf'], ['category', 'total_sales',
+                                                                      'total_quantity'])
+        }
+        
+        return self._format_kpis(data['kpis']) + (aggregates,)
+    
+    def _to_columns(self, df: pd.DataFrame, columns: list) -> Optional[Dict[str, list]]:
+        """Convert selected DataFrame columns to JSON-ready lists"""
+        if df.empty:
+            return None
+        return {column: df[column].tolist() for column in columns}
+    
+    def _sunburst_hierarchy(self, df: pd.DataFrame, path: list,
+                            value: str) -> Optional[Dict[str, list]]:
+        """Roll leaf rows up into sunburst ids/labels/parents/values arrays"""
+        if df.empty:
+            return None
+        
+        # Sort leaves by the full path so every node's rows are contiguous
+        levels = [df[column].to_numpy(dtype=str, na_value='n/a') for column in path]
+        order = np.lexsort(levels[::-1])
+        levels = [level[order] for level in levels]
+        values = df[value].to_numpy()[order]
+        
+        ids, labels, parents, totals = [], [], [], []
+        row_ids = np.full(len(values), '')
+        new_node = np.zeros(len(values), dtype=bool)
+        new_node[0] = True
+        for depth, level in enumerate(levels):
+            parent_ids = row_ids
+            row_ids = level if depth == 0 else np.char.add(np.char.add(parent_ids, '/'), level)
+            # A node starts wherever this level or any level above it changes
+            new_node[1:] |= level[1:] != level[:-1]
+            starts = np.flatnonzero(new_node)
+            ids.extend(row_ids[starts].tolist())
+            labels.extend(level[starts].tolist())
+            parents.extend(parent_ids[starts].tolist())
+            totals.extend(np.add.reduceat(values, starts).tolist())
+        
+        return {'ids': ids, 'labels': labels, 'parents': parents, 'values': totals}
     
     def run_dashboard(self, host='127.0.0.1', port=8050, debug=False):
         """Run the dashboard server"""
@@ -380,91 +599,57 @@ class BusinessDashboard:
     
     def generate_static_report(self, output_file='business_report.html') -> str:
         """Generate a static HTML business report"""
-        sales_df = self.get_sales_data()
-        customer_df = self.get_customer_summary()
-        product_df = self.get_product_performance()
+        if REPORT_TEMPLATE is None:
+            raise ImportError("jinja2 is required to generate the static report. Install it with: pip install jinja2")
         
-        if sales_df.empty:
+        data = self._compute_aggregates()
+        daily_sales = data['daily_sales']
+        country_sales = data['country_sales']
+        product_df = data['product_df']
+        
+        if daily_sales.empty:
             print("No data available for report generation")
             return ""
         
-        # Create visualizations
+        # Create visualizations (graph_objects on raw arrays, skipping plotly.express)
         figs = []
         
         # Sales trend
-        daily_sales = sales_df.groupby(sales_df['order_date'].dt.date)['sales_amount'].sum().reset_index()
-        fig1 = px.line(daily_sales, x='order_date', y='sales_amount', title="Sales Trend")
-        figs.append(fig1.to_html(full_html=False, include_plotlyjs='cdn'))
+        fig1 = go.Figure(go.Scattergl(x=daily_sales['order_date'].to_numpy(),
+                                      y=daily_sales['sales_amount'].to_numpy(), mode='lines'),
+                         layout=dict(title="Sales Trend"))
+        figs.append(fig1)
         
         # Top products
         if not product_df.empty:
-            top_products = product_df.head(10)
-            fig2 = px.bar(top_products, x='product_name', y='total_sales', title="Top Products")
-            figs.append(fig2.to_html(full_html=False, include_plotlyjs=False))
+            fig2 = go.Figure(go.Bar(x=product_df['product_name'].to_numpy(),
+                                    y=product_df['total_sales'].to_numpy()),
+                             layout=dict(title="Top Products"))
+            figs.append(fig2)
         
         # Country distribution
-        country_sales = sales_df.groupby('country')['sales_amount'].sum().reset_index()
-        fig3 = px.pie(country_sales, values='sales_amount', names='country', title="Sales by Country")
-        figs.append(fig3.to_html(full_html=False, include_plotlyjs=False))
-        
-        # Generate HTML report
-        html_content = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <title>Business Intelligence Report</title>
-            <style>
-                body {{ font-family: Arial, sans-serif; margin: 40px; }}
-                .header {{ background-color: #2E86AB; color: white; padding: 20px; border-radius: 5px; }}
-                .kpi {{ display: flex; justify-content: space-around; margin: 20px 0; }}
-                .kpi-card {{ text-align: center; padding: 20px; background-color: #f5f5f5; border-radius: 5px; }}
-                .kpi-value {{ font-size: 2em; font-weight: bold; color: #2E86AB; }}
-                .chart {{ margin: 30px 0; }}
-            </style>
-        </head>
-        <body>
-            <div class="header">
-                <h1>📊 Business Intelligence Report</h1>
-                <p>Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</p>
-            </div>
-            
-            <div class="kpi">
-                <div class="kpi-card">
-                    <div class="kpi-value">${sales_df['sales_amount'].sum():,.0f}</div>
-                    <div>Total Sales</div>
-                </div>
-                <div class="kpi-card">
-                    <div class="kpi-value">{len(sales_df):,}</div>
-                    <div>Total Orders</div>
-                </div>
-                <div class="kpi-card">
-                    <div class="kpi-value">{sales_df['customer_name'].nunique():,}</div>
-                    <div>Unique Customers</div>
-                </div>
-                <div class="kpi-card">
-                    <div class="kpi-value">${sales_df['sales_amount'].mean():.2f}</div>
-                    <div>Avg Order Value</div>
-                </div>
-            </div>
-            
-            <div class="chart">
-                {figs[0] if len(figs) > 0 else '<p>No charts available</p>'}
-            </div>
-            
-            <div class="chart">
-                {figs[1] if len(figs) > 1 else ''}
-            </div>
-            
-            <div class="chart">
-                {figs[2] if len(figs) > 2 else ''}
-            </div>
-            
-        </body>
-        </html>
-        """
+        if not country_sales.empty:
+            fig3 = go.Figure(go.Pie(labels=country_sales['country'].to_numpy(),
+                                    values=country_sales['sales_amount'].to_numpy()),
+                             layout=dict(title="Sales by Country (Top 10)"))
+            figs.append(fig3)
+        
+        # Only the first chart pulls in plotly.js; traces were validated when built
+        fig_html = [fig.to_html(full_html=False, include_plotlyjs='cdn' if i == 0 else False,
+                                validate=False)
+                    for i, fig in enumerate(figs)]
+        
+        total_sales, total_orders, total_customers, avg_order = self._format_kpis(data['kpis'])
+        html_content = REPORT_TEMPLATE.render(
+            generated_time=datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            total_sales=total_sales,
+            total_orders=total_orders,
+            total_customers=total_customers,
+            avg_order=avg_order,
+            figs=fig_html
+        )
         
-        with open(output_file, 'w') as f:
-            f.write(html_content)
+        Path(output_file).write_text(html_content, encoding='utf-8')
         
         print(f"Static business report generated: {output_file}")
         return output_file
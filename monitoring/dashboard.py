@@ -4,39 +4,268 @@ Modern Data Warehouse - Data Quality Dashboard
 A web-based dashboard for monitoring data quality metrics and pipeline health.
 """
 
+import hashlib
 import json
+import queue
 import sqlite3
-from datetime import datetime, timedelta
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from itertools import groupby
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Dict, Any, List
+from typing import Callable, Dict, Any, List, Optional, Tuple
 
 try:
-    from flask import Flask, render_template, jsonify, request
+    from flask import Flask, Response, render_template, request
     import plotly.graph_objs as go
     import plotly.utils
-    import pandas as pd
     FLASK_AVAILABLE = True
 except ImportError:
     FLASK_AVAILABLE = False
 
+try:
+    from flask_compress import Compress
+    COMPRESS_AVAILABLE = True
+except ImportError:
+    COMPRESS_AVAILABLE = False
+
+try:
+    import jinja2
+    JINJA2_AVAILABLE = True
+except ImportError:
+    JINJA2_AVAILABLE = False
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    from waitress import serve
+    WAITRESS_AVAILABLE = True
+except ImportError:
+    WAITRESS_AVAILABLE = False
+
+# Worker threads for the production server
+SERVER_THREADS = 8
+
+# Seconds a dashboard data snapshot is served before re-querying
+CACHE_TTL = 30
+
+# Bump when _init_database changes the metrics schema
+SCHEMA_VERSION = 2
+
+# Days covered by the dashboard's rolling success rate and quality score
+SUMMARY_WINDOW_DAYS = 30
+
+# Rolling-window aggregates over pipeline_runs, shared by the summary writer and reader
+SUMMARY_WINDOW_SQL = """
+    SELECT
+        COUNT(*),
+        COALESCE(SUM(CASE WHEN status = 'COMPLETED' THEN 1 ELSE 0 END), 0),
+        AVG(data_quality_score),
+        (SELECT id FROM pipeline_runs WHERE created_at >= :cutoff ORDER BY created_at, id LIMIT 1)
+    FROM pipeline_runs
+    WHERE created_at >= :cutoff
+"""
+
+# Read-only connections serving the dashboard queries in parallel
+READER_POOL_SIZE = 4
+
+# Static report template, compiled once at import with HTML autoescaping
+REPORT_TEMPLATE_SOURCE = """<!DOCTYPE html>
+<html>
+<head>
+    <title>Data Quality Report</title>
+    <style>
+        body { font-family: Arial, sans-serif; margin: 40px; }
+        .header { background-color: #2E86AB; color: white; padding: 20px; border-radius: 5px; }
+        .summary { display: flex; justify-content: space-around; margin: 20px 0; }
+        .metric { text-align: center; padding: 20px; background-color: #f5f5f5; border-radius: 5px; }
+        .metric-value { font-size: 2em; font-weight: bold; color: #2E86AB; }
+        .section { margin: 30px 0; }
+        .section h2 { color: #2E86AB; border-bottom: 2px solid #2E86AB; padding-bottom: 10px; }
+        table { width: 100%; border-collapse: collapse; margin: 20px 0; }
+        th, td { border: 1px solid #ddd; padding: 12px; text-align: left; }
+        th { background-color: #f2f2f2; }
+        .pass { color: green; font-weight: bold; }
+        .fail { color: red; font-weight: bold; }
+        .status-completed { color: green; font-weight: bold; }
+        .status-failed { color: red; font-weight: bold; }
+    </style>
+</head>
+<body>
+    <div class="header">
+        <h1>Data Quality Report</h1>
+        <p>Generated: {{ generated_time }}</p>
+    </div>
+
+    <div class="summary">
+        <div class="metric">
+            <div class="metric-value">{{ total_runs }}</div>
+            <div>Total Runs</div>
+        </div>
+        <div class="metric">
+            <div class="metric-value">{{ success_rate }}%</div>
+            <div>Success Rate (30d)</div>
+        </div>
+        <div class="metric">
+            <div class="metric-value">{{ avg_quality_score }}%</div>
+            <div>Avg Quality Score</div>
+        </div>
+        <div class="metric">
+            <div class="metric-value status-{{ latest_status|lower }}">{{ latest_status }}</div>
+            <div>Latest Status</div>
+        </div>
+    </div>
+
+    <div class="section">
+        <h2>Recent Pipeline Runs</h2>
+        <table>
+            <tr>
+                <th>Timestamp</th>
+                <th>Status</th>
+                <th>Duration (s)</th>
+                <th>Records</th>
+                <th>Quality Score</th>
+                <th>Errors</th>
+            </tr>
+            {% for run in recent_runs %}
+            <tr>
+                <td>{{ run.run_timestamp }}</td>
+                <td class="status-{{ run.status|lower }}">{{ run.status }}</td>
+                <td>{{ '%.1f'|format(run.duration_seconds) }}</td>
+                <td>{{ '{:,}'.format(run.total_records) }}</td>
+                <td>{% if run.data_quality_score %}{{ '%.1f'|format(run.data_quality_score * 100) }}%{% else %}N/A{% endif %}</td>
+                <td>{{ run.error_count }}</td>
+            </tr>
+            {% endfor %}
+        </table>
+    </div>
+
+    <div class="section">
+        <h2>Latest Quality Checks</h2>
+        <table>
+            <tr>
+                <th>Check Name</th>
+                <th>Status</th>
+                <th>Score</th>
+                <th>Details</th>
+            </tr>
+            {% for check in latest_checks %}
+            <tr>
+                <td>{{ check.check_name }}</td>
+                <td class="{{ 'pass' if check.passed else 'fail' }}">{{ 'PASS' if check.passed else 'FAIL' }}</td>
+                <td>{{ '%.1f'|format(check.score * 100) }}%</td>
+                <td>{{ check.details }}</td>
+            </tr>
+            {% endfor %}
+        </table>
+    </div>
+</body>
+</html>
+"""
+REPORT_TEMPLATE = (jinja2.Environment(autoescape=True).from_string(REPORT_TEMPLATE_SOURCE)
+                   if JINJA2_AVAILABLE else None)
+
 class DataQualityDashboard:
     """Web-based data quality monitoring dashboard"""
     
     def __init__(self, db_path: str = "monitoring/quality_metrics.db"):
         self.db_path = db_path
         self.app = None
+        self._write_lock = threading.Lock()
+        self._conn = self._connect()
+        self._cache = None
+        self._cache_ts = 0.0
+        self._cache_lock = threading.Lock()
+        self._chart_cache: Dict[str, Tuple[tuple, str]] = {}
+        self._payload = None
         
         if FLASK_AVAILABLE:
             self.app = Flask(__name__)
             self._setup_routes()
         
         self._init_database()
+        
+        # Under WAL, readers see committed data without blocking the writer
+        self._readers = queue.Queue()
+        for _ in range(READER_POOL_SIZE):
+            self._readers.put(self._connect(readonly=True))
+        self._executor = ThreadPoolExecutor(max_workers=READER_POOL_SIZE)
+    
+    def _connect(self, readonly: bool = False) -> sqlite3.Connection:
+        """Open a long-lived metrics connection with WAL and tuned PRAGMAs"""
+        if readonly:
+            conn = sqlite3.connect(f"{Path(self.db_path).resolve().as_uri()}?mode=ro", uri=True,
+                                   check_same_thread=False, cached_statements=256)
+        else:
+            Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+            
+            # Autocommit mode; multi-statement writes open explicit transactions
+            conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None,
+                                   cached_statements=256)
+            conn.execute("PRAGMA journal_mode=WAL")
+        
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA cache_size=-64000")
+        conn.execute("PRAGMA busy_timeout=5000")
+        conn.execute("PRAGMA mmap_size=268435456")
+        return conn
+    
+    @contextmanager
+    def _transaction(self):
+        """Serialize writers and run the block as a single transaction"""
+        with self._write_lock:
+            conn = self._conn
+            # Take the write lock up front instead of upgrading mid-transaction
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+            # Committed writes make any cached dashboard data and charts stale
+            self._cache_ts = 0.0
+            self._chart_cache.clear()
+    
+    @contextmanager
+    def _reader(self):
+        """Borrow a read-only connection from the pool"""
+        conn = self._readers.get()
+        try:
+            yield conn
+        finally:
+            self._readers.put(conn)
+    
+    def close(self):
+        """Close the reader pool, checkpoint the WAL and close the metrics connection"""
+        self._executor.shutdown()
+        for _ in range(READER_POOL_SIZE):
+            self._readers.get().close()
+        
+        with self._write_lock:
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            self._conn.close()
+    
+    @staticmethod
+    def _window_cutoff() -> str:
+        """Start of the summary window, formatted like SQLite's CURRENT_TIMESTAMP (UTC)"""
+        cutoff = datetime.now(timezone.utc) - timedelta(days=SUMMARY_WINDOW_DAYS)
+        return cutoff.strftime('%Y-%m-%d %H:%M:%S')
     
     def _init_database(self):
         """Initialize SQLite database for storing metrics"""
-        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        # Already-initialized databases only cost a header read
+        if self._conn.execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_VERSION:
+            return
         
-        with sqlite3.connect(self.db_path) as conn:
+        with self._transaction() as conn:
             cursor = conn.cursor()
             
             # Create tables for storing metrics
@@ -79,168 +308,258 @@ class DataQualityDashboard:
                 )
             """)
             
-            conn.commit()
+            # Indexes for the dashboard's recency ordering and run_id joins
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_runs_created ON pipeline_runs (created_at DESC)")
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_runs_qscore
+                ON pipeline_runs (created_at DESC, data_quality_score)
+            """)
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_checks_run ON data_quality_checks (run_id)")
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_tm_run
+                ON table_metrics (run_id, schema_name, table_name)
+            """)
+            
+            # Single-row summary maintained by store_pipeline_run
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS dashboard_summary (
+                    id INTEGER PRIMARY KEY CHECK (id = 1),
+                    total_runs INTEGER NOT NULL DEFAULT 0,
+                    total_30d INTEGER NOT NULL DEFAULT 0,
+                    successful_30d INTEGER NOT NULL DEFAULT 0,
+                    avg_quality_30d REAL,
+                    oldest_run_30d INTEGER,
+                    latest_status TEXT,
+                    latest_timestamp TEXT
+                )
+            """)
+            
+            # Version 1 summaries predate oldest_run_30d
+            columns = {row[1] for row in cursor.execute("PRAGMA table_info(dashboard_summary)")}
+            if 'oldest_run_30d' not in columns:
+                cursor.execute("ALTER TABLE dashboard_summary ADD COLUMN oldest_run_30d INTEGER")
+            
+            # Seed it from any existing history
+            cursor.execute("""
+                WITH latest AS (
+                    SELECT status, run_timestamp
+                    FROM pipeline_runs
+                    ORDER BY created_at DESC
+                    LIMIT 1
+                )
+                INSERT OR IGNORE INTO dashboard_summary (id, total_runs, latest_status, latest_timestamp)
+                SELECT
+                    1,
+                    (SELECT COUNT(*) FROM pipeline_runs),
+                    (SELECT status FROM latest),
+                    (SELECT run_timestamp FROM latest)
+            """)
+            window = cursor.execute(SUMMARY_WINDOW_SQL, {'cutoff': self._window_cutoff()}).fetchone()
+            cursor.execute("""
+                UPDATE dashboard_summary
+                SET total_30d = ?, successful_30d = ?, avg_quality_30d = ?, oldest_run_30d = ?
+                WHERE id = 1
+            """, window)
+            
+            # Refresh planner statistics so the indexes get picked
+            cursor.execute("ANALYZE")
+            cursor.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
     
     def store_pipeline_run(self, run_data: Dict[str, Any]) -> int:
         """Store pipeline run data and return run ID"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._transaction() as conn:
             cursor = conn.cursor()
+            run_timestamp = run_data.get('timestamp', datetime.now().isoformat())
+            status = run_data.get('status', 'UNKNOWN')
             
             cursor.execute("""
                 INSERT INTO pipeline_runs 
                 (run_timestamp, status, duration_seconds, total_records, data_quality_score, error_count)
                 VALUES (?, ?, ?, ?, ?, ?)
             """, (
-                run_data.get('timestamp', datetime.now().isoformat()),
-                run_data.get('status', 'UNKNOWN'),
+                run_timestamp,
+                status,
                 run_data.get('duration', 0),
                 run_data.get('total_records', 0),
                 run_data.get('data_quality_score', 0),
                 run_data.get('error_count', 0)
             ))
-            
             run_id = cursor.lastrowid
-            conn.commit()
-            return run_id
+            
+            # Keep the summary row in step with the insert, in the same transaction
+            window = cursor.execute(SUMMARY_WINDOW_SQL, {'cutoff': self._window_cutoff()}).fetchone()
+            cursor.execute("""
+                UPDATE dashboard_summary
+                SET total_runs = total_runs + 1,
+                    total_30d = ?,
+                    successful_30d = ?,
+                    avg_quality_30d = ?,
+                    oldest_run_30d = ?,
+                    latest_status = ?,
+                    latest_timestamp = ?
+                WHERE id = 1
+            """, (*window, status, run_timestamp))
+        
+        return run_id
     
     def store_quality_checks(self, run_id: int, quality_results: List[Dict[str, Any]]):
         """Store data quality check results"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            
-            for result in quality_results:
-                cursor.execute("""
-                    INSERT INTO data_quality_checks 
-                    (run_id, check_name, check_category, passed, score, details)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                """, (
-                    run_id,
-                    result.get('check_name', ''),
-                    result.get('category', 'General'),
-                    result.get('passed', False),
-                    result.get('score', 0.0),
-                    result.get('details', '')
-                ))
-            
-            conn.commit()
+        rows = [(
+            run_id,
+            result.get('check_name', ''),
+            result.get('category', 'General'),
+            result.get('passed', False),
+            result.get('score', 0.0),
+            result.get('details', '')
+        ) for result in quality_results]
+        
+        with self._transaction() as conn:
+            conn.executemany("""
+                INSERT INTO data_quality_checks 
+                (run_id, check_name, check_category, passed, score, details)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, rows)
     
     def store_table_metrics(self, run_id: int, table_counts: Dict[str, Dict[str, int]]):
         """Store table row count metrics"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            
-            for schema, tables in table_counts.items():
-                for table_name, row_count in tables.items():
-                    cursor.execute("""
-                        INSERT INTO table_metrics 
-                        (run_id, schema_name, table_name, row_count)
-                        VALUES (?, ?, ?, ?)
-                    """, (run_id, schema, table_name, row_count))
-            
-            conn.commit()
+        rows = [(run_id, schema, table_name, row_count)
+                for schema, tables in table_counts.items()
+                for table_name, row_count in tables.items()]
+        
+        with self._transaction() as conn:
+            conn.executemany("""
+                INSERT INTO table_metrics 
+                (run_id, schema_name, table_name, row_count)
+                VALUES (?, ?, ?, ?)
+            """, rows)
     
     def get_dashboard_data(self) -> Dict[str, Any]:
-        """Get data for the dashboard"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            
-            # Get latest pipeline runs
-            cursor.execute("""
+        """Get data for the dashboard, reusing a snapshot younger than CACHE_TTL"""
+        # One thread refreshes while concurrent requests wait for its result
+        with self._cache_lock:
+            if self._cache is None or time.monotonic() - self._cache_ts >= CACHE_TTL:
+                self._cache = self._query_dashboard_data()
+                self._cache_ts = time.monotonic()
+            return self._cache
+    
+    def _query_dashboard_data(self) -> Dict[str, Any]:
+        """Query the metrics database for dashboard data"""
+        # Independent reads, run concurrently on the reader pool
+        queries = {
+            'recent_runs': self._get_recent_runs,
+            'quality_trend': self._get_quality_trend,
+            'latest_checks': self._get_latest_checks,
+            'table_trends': self._get_table_trends,
+            'summary': self._get_summary_stats
+        }
+        futures = {name: self._executor.submit(query) for name, query in queries.items()}
+        return {name: future.result() for name, future in futures.items()}
+    
+    def _get_recent_runs(self) -> List[Dict[str, Any]]:
+        """Get latest pipeline runs"""
+        with self._reader() as conn:
+            return self._fetch_dicts(conn.execute("""
                 SELECT * FROM pipeline_runs 
                 ORDER BY created_at DESC 
                 LIMIT 10
-            """)
-            recent_runs = [dict(row) for row in cursor.fetchall()]
-            
-            # Get quality score trend
-            cursor.execute("""
+            """))
+    
+    def _get_quality_trend(self) -> List[Dict[str, Any]]:
+        """Get quality score trend for the last 30 scored runs, oldest first"""
+        with self._reader() as conn:
+            return self._fetch_dicts(conn.execute("""
                 SELECT run_timestamp, data_quality_score, status
-                FROM pipeline_runs 
-                WHERE data_quality_score IS NOT NULL
-                ORDER BY created_at DESC 
-                LIMIT 30
-            """)
-            quality_trend = [dict(row) for row in cursor.fetchall()]
-            
-            # Get latest quality checks
-            cursor.execute("""
+                FROM (
+                    SELECT run_timestamp, data_quality_score, status, created_at, id
+                    FROM pipeline_runs 
+                    WHERE data_quality_score IS NOT NULL
+                    ORDER BY created_at DESC 
+                    LIMIT 30
+                )
+                ORDER BY created_at, id
+            """))
+    
+    def _get_latest_checks(self) -> List[Dict[str, Any]]:
+        """Get latest quality checks"""
+        with self._reader() as conn:
+            latest_run_id = conn.execute("SELECT MAX(id) FROM pipeline_runs").fetchone()[0]
+            return self._fetch_dicts(conn.execute("""
                 SELECT dqc.*, pr.run_timestamp
                 FROM data_quality_checks dqc
-                JOIN pipeline_runs pr ON dqc.run_id = pr.id
-                WHERE pr.id = (SELECT MAX(id) FROM pipeline_runs)
-            """)
-            latest_checks = [dict(row) for row in cursor.fetchall()]
-            
-            # Get table size trends
-            cursor.execute("""
+                JOIN pipeline_runs pr ON pr.id = dqc.run_id
+                WHERE dqc.run_id = ?
+            """, (latest_run_id,)))
+    
+    def _get_table_trends(self) -> List[Dict[str, Any]]:
+        """Get table size trends"""
+        with self._reader() as conn:
+            return self._fetch_dicts(conn.execute("""
                 SELECT tm.schema_name, tm.table_name, tm.row_count, pr.run_timestamp
                 FROM table_metrics tm
                 JOIN pipeline_runs pr ON tm.run_id = pr.id
                 ORDER BY pr.created_at DESC, tm.schema_name, tm.table_name
                 LIMIT 100
-            """)
-            table_trends = [dict(row) for row in cursor.fetchall()]
-            
-            return {
-                'recent_runs': recent_runs,
-                'quality_trend': quality_trend,
-                'latest_checks': latest_checks,
-                'table_trends': table_trends,
-                'summary': self._get_summary_stats()
-            }
+            """))
+    
+    def _get_table_trends_latest(self) -> List[Tuple[str, str, int]]:
+        """Get (schema, table, row count) rows for the latest run with table metrics"""
+        with self._reader() as conn:
+            return conn.execute("""
+                SELECT schema_name, table_name, row_count
+                FROM table_metrics
+                WHERE run_id = (SELECT MAX(run_id) FROM table_metrics)
+                ORDER BY schema_name, table_name
+            """).fetchall()
+    
+    @staticmethod
+    def _fetch_dicts(cursor: sqlite3.Cursor) -> List[Dict[str, Any]]:
+        """Fetch all rows as dicts, reading the column names once"""
+        columns = [column[0] for column in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
     
     def _get_summary_stats(self) -> Dict[str, Any]:
         """Get summary statistics"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            
-            # Total runs
-            cursor.execute("SELECT COUNT(*) FROM pipeline_runs")
-            total_runs = cursor.fetchone()[0]
-            
-            # Success rate
-            cursor.execute("""
-                SELECT 
-                    COUNT(*) as total,
-                    SUM(CASE WHEN status = 'COMPLETED' THEN 1 ELSE 0 END) as successful
-                FROM pipeline_runs
-                WHERE created_at >= datetime('now', '-30 days')
-            """)
-            result = cursor.fetchone()
-            success_rate = (result[1] / result[0] * 100) if result[0] > 0 else 0
-            
-            # Average quality score
-            cursor.execute("""
-                SELECT AVG(data_quality_score) 
-                FROM pipeline_runs 
-                WHERE data_quality_score IS NOT NULL 
-                AND created_at >= datetime('now', '-30 days')
-            """)
-            avg_quality_score = cursor.fetchone()[0] or 0
-            
-            # Latest run status
-            cursor.execute("""
-                SELECT status, run_timestamp 
-                FROM pipeline_runs 
-                ORDER BY created_at DESC 
+        # Maintained on write, so this is usually a single-row lookup
+        cutoff = self._window_cutoff()
+        with self._reader() as conn:
+            result = self._fetch_dicts(conn.execute("SELECT * FROM dashboard_summary WHERE id = 1"))[0]
+            total_30d = result['total_30d']
+            successful_30d = result['successful_30d']
+            avg_quality_30d = result['avg_quality_30d']
+            
+            # The window slides without writes; runs leave it oldest first, so an
+            # index seek for the oldest run still inside shows whether any have left
+            oldest = conn.execute("""
+                SELECT id FROM pipeline_runs
+                WHERE created_at >= ?
+                ORDER BY created_at, id
                 LIMIT 1
-            """)
-            latest_run = cursor.fetchone()
-            
-            return {
-                'total_runs': total_runs,
-                'success_rate': round(success_rate, 1),
-                'avg_quality_score': round(avg_quality_score * 100, 1) if avg_quality_score else 0,
-                'latest_status': latest_run[0] if latest_run else 'UNKNOWN',
-                'latest_timestamp': latest_run[1] if latest_run else None
-            }
+            """, (cutoff,)).fetchone()
+            if (oldest[0] if oldest else None) != result['oldest_run_30d']:
+                total_30d, successful_30d, avg_quality_30d, _ = conn.execute(
+                    SUMMARY_WINDOW_SQL, {'cutoff': cutoff}).fetchone()
+        
+        total_runs = result['total_runs']
+        success_rate = (successful_30d / total_30d * 100) if total_30d > 0 else 0
+        avg_quality_score = avg_quality_30d or 0
+        latest_run = (result['latest_status'], result['latest_timestamp']) if result['latest_status'] else None
+        
+        return {
+            'total_runs': total_runs,
+            'success_rate': round(success_rate, 1),
+            'avg_quality_score': round(avg_quality_score * 100, 1) if avg_quality_score else 0,
+            'latest_status': latest_run[0] if latest_run else 'UNKNOWN',
+            'latest_timestamp': latest_run[1] if latest_run else None
+        }
     
     def _setup_routes(self):
         """Setup Flask routes for the dashboard"""
         if not self.app:
             return
         
+        if COMPRESS_AVAILABLE:
+            Compress(self.app)
+        
         @self.app.route('/')
         def dashboard():
             """Main dashboard page"""
@@ -249,80 +568,118 @@ class DataQualityDashboard:
         @self.app.route('/api/dashboard-data')
         def api_dashboard_data():
             """API endpoint for dashboard data"""
-            return jsonify(self.get_dashboard_data())
+            body, etag = self._dashboard_payload()
+            response = Response(body, mimetype='application/json')
+            response.set_etag(etag)
+            response.cache_control.max_age = CACHE_TTL
+            # Answers 304 with no body when the client already has this snapshot
+            return response.make_conditional(request)
         
         @self.app.route('/api/quality-trend-chart')
         def api_quality_trend_chart():
             """API endpoint for quality trend chart"""
-            data = self.get_dashboard_data()
-            quality_trend = data['quality_trend']
-            
-            if not quality_trend:
-                return jsonify({})
-            
-            # Create Plotly chart
-            df = pd.DataFrame(quality_trend)
-            df['run_timestamp'] = pd.to_datetime(df['run_timestamp'])
-            df['data_quality_score'] = df['data_quality_score'] * 100  # Convert to percentage
-            
-            fig = go.Figure()
-            fig.add_trace(go.Scatter(
-                x=df['run_timestamp'],
-                y=df['data_quality_score'],
-                mode='lines+markers',
-                name='Data Quality Score',
-                line=dict(color='#2E86AB', width=3),
-                marker=dict(size=8)
-            ))
-            
-            fig.update_layout(
-                title='Data Quality Trend (Last 30 Runs)',
-                xaxis_title='Run Date',
-                yaxis_title='Quality Score (%)',
-                yaxis=dict(range=[0, 100]),
-                template='plotly_white',
-                height=400
-            )
-            
-            return json.dumps(fig, cls=plotly.utils.PlotlyJSONEncoder)
+            return self._cached_chart('quality_trend', self._build_quality_trend_chart)
         
         @self.app.route('/api/table-size-chart')
         def api_table_size_chart():
             """API endpoint for table size chart"""
-            data = self.get_dashboard_data()
-            table_trends = data['table_trends']
-            
-            if not table_trends:
-                return jsonify({})
-            
-            # Get latest run data
-            df = pd.DataFrame(table_trends)
-            latest_run = df['run_timestamp'].max()
-            latest_data = df[df['run_timestamp'] == latest_run]
-            
-            fig = go.Figure()
-            
-            for schema in latest_data['schema_name'].unique():
-                schema_data = latest_data[latest_data['schema_name'] == schema]
-                
-                fig.add_trace(go.Bar(
-                    name=schema.title(),
-                    x=schema_data['table_name'],
-                    y=schema_data['row_count'],
-                    text=schema_data['row_count'],
-                    textposition='auto'
-                ))
-            
-            fig.update_layout(
-                title='Table Row Counts (Latest Run)',
-                xaxis_title='Table Name',
-                yaxis_title='Row Count',
-                barmode='group',
-                template='plotly_white',
-                height=400
-            )
-            
-            return json.dumps(fig, cls=plotly.utils.PlotlyJSONEncoder)
+            return self._cached_chart('table_size', self._build_table_size_chart)
+    
+    def _dashboard_payload(self) -> Tuple[bytes, str]:
+        """Serialized dashboard data and its ETag, computed once per snapshot"""
+        data = self.get_dashboard_data()
+        payload = self._payload
+        if payload is None or payload[0] is not data:
+            if ORJSON_AVAILABLE:
+                body = orjson.dumps(data)
+            else:
+                body = json.dumps(data).encode('utf-8')
+            payload = (data, body, hashlib.sha1(body).hexdigest())
+            self._payload = payload
+        return payload[1], payload[2]
+    
+    def _cached_chart(self, name: str, build: Callable[[], Optional['go.Figure']]) -> 'Response':
+        """Serve a chart's JSON, serializing it at most once per metrics database state"""
+        # The ETL writes from another process, so read its progress on every request:
+        # two index lookups, covering both the run row and its later table metrics
+        with self._reader() as conn:
+            version = conn.execute("""
+                SELECT (SELECT MAX(id) FROM pipeline_runs), (SELECT MAX(run_id) FROM table_metrics)
+            """).fetchone()
+        
+        cached = self._chart_cache.get(name)
+        if cached is not None and cached[0] == version:
+            return Response(cached[1], mimetype='application/json')
+        
+        fig = build()
+        chart_json = json.dumps(fig, cls=plotly.utils.PlotlyJSONEncoder) if fig is not None else '{}'
+        self._chart_cache[name] = (version, chart_json)
+        return Response(chart_json, mimetype='application/json')
+    
+    def _build_quality_trend_chart(self) -> Optional['go.Figure']:
+        """Build the quality trend chart"""
+        quality_trend = self._get_quality_trend()
+        
+        if not quality_trend:
+            return None
+        
+        # Create Plotly chart
+        # Whole seconds and one decimal keep the payload small and quick to encode
+        xs = [row['run_timestamp'][:19] for row in quality_trend]
+        ys = [round(row['data_quality_score'] * 100, 1) for row in quality_trend]  # Convert to percentage
+        
+        fig = go.Figure()
+        fig.add_trace(go.Scatter(
+            x=xs,
+            y=ys,
+            mode='lines+markers',
+            name='Data Quality Score',
+            line=dict(color='#2E86AB', width=3),
+            marker=dict(size=8)
+        ))
+        
+        fig.update_layout(
+            title='Data Quality Trend (Last 30 Runs)',
+            xaxis_title='Run Date',
+            yaxis_title='Quality Score (%)',
+            yaxis=dict(range=[0, 100]),
+            template='plotly_white',
+            height=400
+        )
+        
+        return fig
+    
+    def _build_table_size_chart(self) -> Optional['go.Figure']:
+        """Build the latest run's table row count chart"""
+        latest_data = self._get_table_trends_latest()
+        
+        if not latest_data:
+            return None
+        
+        fig = go.Figure()
+        
+        # Rows arrive ordered by schema, so each group is one contiguous run
+        for schema, rows in groupby(latest_data, key=lambda row: row[0]):
+            _, table_names, row_counts = zip(*rows)
+            
+            fig.add_trace(go.Bar(
+                name=schema.title(),
+                x=table_names,
+                y=row_counts,
+                text=row_counts,
+                textposition='auto'
+            ))
+        
+        fig.update_layout(
+            title='Table Row Counts (Latest Run)',
+            xaxis_title='Table Name',
+            yaxis_title='Row Count',
+            barmode='group',
+            template='plotly_white',
+            height=400
+        )
+        
+        return fig
     
     def run_dashboard(self, host: str = '127.0.0.1', port: int = 5000, debug: bool = False):
         """Run the Flask dashboard"""
@@ -336,133 +693,27 @@ class DataQualityDashboard:
             return
         
         print(f"Starting Data Quality Dashboard at http://{host}:{port}")
-        self.app.run(host=host, port=port, debug=debug)
+        if debug or not WAITRESS_AVAILABLE:
+            self.app.run(host=host, port=port, debug=debug, threaded=True)
+        else:
+            serve(self.app, host=host, port=port, threads=SERVER_THREADS)
     
     def generate_html_report(self, output_file: str = "data_quality_report.html") -> str:
         """Generate a static HTML report"""
-        data = self.get_dashboard_data()
+        if REPORT_TEMPLATE is None:
+            raise ImportError("jinja2 is required to generate the HTML report. Install it with: pip install jinja2")
         
-        html_template = """
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <title>Data Quality Report</title>
-            <style>
-                body { font-family: Arial, sans-serif; margin: 40px; }
-                .header { background-color: #2E86AB; color: white; padding: 20px; border-radius: 5px; }
-                .summary { display: flex; justify-content: space-around; margin: 20px 0; }
-                .metric { text-align: center; padding: 20px; background-color: #f5f5f5; border-radius: 5px; }
-                .metric-value { font-size: 2em; font-weight: bold; color: #2E86AB; }
-                .section { margin: 30px 0; }
-                .section h2 { color: #2E86AB; border-bottom: 2px solid #2E86AB; padding-bottom: 10px; }
-                table { width: 100%; border-collapse: collapse; margin: 20px 0; }
-                th, td { border: 1px solid #ddd; padding: 12px; text-align: left; }
-                th { background-color: #f2f2f2; }
-                .pass { color: green; font-weight: bold; }
-                .fail { color: red; font-weight: bold; }
-                .status-completed { color: green; font-weight: bold; }
-                .status-failed { color: red; font-weight: bold; }
-            </style>
-        </head>
-        <body>
-            <div class="header">
-                <h1>Data Quality Report</h1>
-                <p>Generated: {generated_time}</p>
-            </div>
-            
-            <div class="summary">
-                <div class="metric">
-                    <div class="metric-value">{total_runs}</div>
-                    <div>Total Runs</div>
-                </div>
-                <div class="metric">
-                    <div class="metric-value">{success_rate}%</div>
-                    <div>Success Rate (30d)</div>
-                </div>
-                <div class="metric">
-                    <div class="metric-value">{avg_quality_score}%</div>
-                    <div>Avg Quality Score</div>
-                </div>
-                <div class="metric">
-                    <div class="metric-value status-{latest_status_class}">{latest_status}</div>
-                    <div>Latest Status</div>
-                </div>
-            </div>
-            
-            <div class="section">
-                <h2>Recent Pipeline Runs</h2>
-                <table>
-                    <tr>
-                        <th>Timestamp</th>
-                        <th>Status</th>
-                        <th>Duration (s)</th>
-                        <th>Records</th>
-                        <th>Quality Score</th>
-                        <th>Errors</th>
-                    </tr>
-                    {recent_runs_rows}
-                </table>
-            </div>
-            
-            <div class="section">
-                <h2>Latest Quality Checks</h2>
-                <table>
-                    <tr>
-                        <th>Check Name</th>
-                        <th>Status</th>
-                        <th>Score</th>
-                        <th>Details</th>
-                    </tr>
-                    {quality_checks_rows}
-                </table>
-            </div>
-        </body>
-        </html>
-        """
-        
-        # Format the data
+        data = self.get_dashboard_data()
         summary = data['summary']
         
-        # Recent runs table
-        recent_runs_rows = ""
-        for run in data['recent_runs']:
-            status_class = run['status'].lower()
-            quality_score = f"{run['data_quality_score']*100:.1f}%" if run['data_quality_score'] else "N/A"
-            recent_runs_rows += f"""
-                <tr>
-                    <td>{run['run_timestamp']}</td>
-                    <td class="status-{status_class}">{run['status']}</td>
-                    <td>{run['duration_seconds']:.1f}</td>
-                    <td>{run['total_records']:,}</td>
-                    <td>{quality_score}</td>
-                    <td>{run['error_count']}</td>
-                </tr>
-            """
-        
-        # Quality checks table
-        quality_checks_rows = ""
-        for check in data['latest_checks']:
-            status_text = "PASS" if check['passed'] else "FAIL"
-            status_class = "pass" if check['passed'] else "fail"
-            quality_checks_rows += f"""
-                <tr>
-                    <td>{check['check_name']}</td>
-                    <td class="{status_class}">{status_text}</td>
-                    <td>{check['score']*100:.1f}%</td>
-                    <td>{check['details']}</td>
-                </tr>
-            """
-        
-        # Fill in the template
-        html_content = html_template.format(
+        html_content = REPORT_TEMPLATE.render(
             generated_time=datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
             total_runs=summary['total_runs'],
             success_rate=summary['success_rate'],
             avg_quality_score=summary['avg_quality_score'],
             latest_status=summary['latest_status'],
-            latest_status_class=summary['latest_status'].lower(),
-            recent_runs_rows=recent_runs_rows,
-            quality_checks_rows=quality_checks_rows
+            recent_runs=data['recent_runs'],
+            latest_checks=data['latest_checks']
         )
         
         # Write to file
@@ -4,14 +4,41 @@ Modern Data Warehouse - Data Lineage Tracker
 Tracks data lineage and dependencies across the data warehouse layers.
 """
 
+import io
 import json
 import logging
+import sys
+from collections import defaultdict, deque
 from datetime import datetime
-from typing import Dict, List, Any, Optional, Set
-from dataclasses import dataclass, asdict
+from typing import Dict, FrozenSet, List, Any, Optional, Set
+from dataclasses import dataclass, fields
+from functools import lru_cache
 from pathlib import Path
+import numpy as np
 
-@dataclass
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# Maps asset-key punctuation to underscores for diagram node ids
+NODE_ID_TRANSLATION = str.maketrans('.-', '__')
+
+# Per-layer node styling for the lineage diagrams
+MERMAID_SCHEMA_CLASS = {'bronze': ':::bronze', 'silver': ':::silver', 'gold': ':::gold'}
+DOT_SCHEMA_COLOR = {'bronze': '#CD7F32', 'silver': '#C0C0C0', 'gold': '#FFD700'}
+
+# Slotted dataclasses where supported (Python 3.10+) for smaller, faster records
+DATACLASS_OPTIONS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+@dataclass(**DATACLASS_OPTIONS)
 class DataAsset:
     """Represents a data asset (table, view, column)"""
     name: str
@@ -27,7 +54,7 @@ class DataAsset:
         if self.tags is None:
             self.tags = []
 
-@dataclass  
+@dataclass(**DATACLASS_OPTIONS)
 class DataTransformation:
     """Represents a data transformation"""
     source_assets: List[str]
@@ -36,6 +63,42 @@ class DataTransformation:
     transformation_logic: str
     created_date: str
     created_by: str
+    
+    def __post_init__(self):
+        # Asset keys repeat across every graph structure; share one str object each
+        self.target_asset = sys.intern(self.target_asset)
+        self.source_assets = [sys.intern(source) for source in self.source_assets]
+
+@lru_cache(maxsize=None)
+def _field_names(cls) -> tuple:
+    """Field names of a dataclass, resolved once per class"""
+    return tuple(f.name for f in fields(cls))
+
+def _shallow_dict(obj) -> Dict[str, Any]:
+    """Top-level field dict for a dataclass; unlike asdict() it does not deep-copy"""
+    return {name: getattr(obj, name) for name in _field_names(type(obj))}
+
+def _bfs_csr(indptr, indices, start):
+    """Visited map of every id reachable from start over CSR arrays"""
+    # start itself is only marked when a cycle leads back to it
+    visited = np.zeros(indptr.shape[0] - 1, np.uint8)
+    stack = np.empty(indptr.shape[0], np.int32)
+    stack[0] = start
+    top = 1
+    while top:
+        top -= 1
+        current = stack[top]
+        for k in range(indptr[current], indptr[current + 1]):
+            neighbour = indices[k]
+            if not visited[neighbour]:
+                visited[neighbour] = 1
+                stack[top] = neighbour
+                top += 1
+    return visited
+
+if NUMBA_AVAILABLE:
+    # Compiled on first use and cached on disk; _freeze warms it up
+    _bfs_csr = njit(cache=True)(_bfs_csr)
 
 class DataLineageTracker:
     """Tracks data lineage and dependencies"""
@@ -44,104 +107,241 @@ class DataLineageTracker:
         self.lineage_file = lineage_file
         self.logger = logging.getLogger(__name__)
         
+        # Resolve the file once; its directory only needs creating once
+        self._path = Path(lineage_file)
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        
         # Initialize lineage data structures
         self.assets: Dict[str, DataAsset] = {}
         self.transformations: List[DataTransformation] = []
-        self.dependencies: Dict[str, Set[str]] = {}  # asset -> dependencies
-        self.downstream: Dict[str, Set[str]] = {}    # asset -> downstream assets
+        self.dependencies: Dict[str, Set[str]] = defaultdict(set)  # asset -> dependencies
+        self.downstream: Dict[str, Set[str]] = defaultdict(set)    # asset -> downstream assets
+        self._transforms_by_source: Dict[str, List[int]] = {}  # asset -> transformation indexes
+        self._node_ids: Dict[str, str] = {}  # asset -> diagram node id
+        
+        # Memoized transitive closures, cleared whenever the graph changes
+        self._upstream_cache: Dict[str, FrozenSet[str]] = {}
+        self._downstream_cache: Dict[str, FrozenSet[str]] = {}
+        self._closures_complete = False
+        
+        # Frozen CSR snapshot of the graphs (see _freeze), dropped on mutation
+        self._id: Dict[str, int] = {}
+        self._id_to_key: List[str] = []
+        self._fwd_indptr = self._fwd_indices = None  # asset -> downstream assets
+        self._bwd_indptr = self._bwd_indices = None  # asset -> dependencies
         
         self.load_lineage()
     
     def add_asset(self, asset: DataAsset):
         """Add a data asset to the lineage"""
-        asset_key = f"{asset.schema}.{asset.name}"
+        asset_key = sys.intern(f"{asset.schema}.{asset.name}")
         self.assets[asset_key] = asset
+        self._node_ids[asset_key] = asset_key.translate(NODE_ID_TRANSLATION)
         
-        if asset_key not in self.dependencies:
-            self.dependencies[asset_key] = set()
-        if asset_key not in self.downstream:
-            self.downstream[asset_key] = set()
-        
+        self._invalidate_closures()
         self.logger.info(f"Added asset: {asset_key}")
     
     def add_transformation(self, transformation: DataTransformation):
         """Add a data transformation to the lineage"""
         self.transformations.append(transformation)
+        self._link_transformation(len(self.transformations) - 1)
         
-        # Update dependencies
-        target = transformation.target_asset
-        if target not in self.dependencies:
-            self.dependencies[target] = set()
+        self._invalidate_closures()
+        self.logger.info(f"Added transformation: {' + '.join(transformation.source_assets)} -> "
+                         f"{transformation.target_asset}")
+    
+    def _invalidate_closures(self):
+        """Drop memoized closures and the frozen graph after a graph change"""
+        self._upstream_cache.clear()
+        self._downstream_cache.clear()
+        self._closures_complete = False
+        self._id = {}
+        self._id_to_key = []
+        self._fwd_indptr = self._fwd_indices = None
+        self._bwd_indptr = self._bwd_indices = None
+    
+    def _freeze(self):
+        """Compact both graphs into integer CSR arrays for repeated queries"""
+        self._id_to_key = list(dict.fromkeys(
+            [*self.assets, *self.dependencies, *self.downstream]))
+        self._id = {key: index for index, key in enumerate(self._id_to_key)}
+        self._fwd_indptr, self._fwd_indices = self._to_csr(self.downstream)
+        self._bwd_indptr, self._bwd_indices = self._to_csr(self.dependencies)
+        
+        if NUMBA_AVAILABLE and self._id_to_key:
+            _bfs_csr(self._fwd_indptr, self._fwd_indices, 0)
+    
+    def _to_csr(self, graph: Dict[str, Set[str]]):
+        """Row pointers and neighbour ids for a graph, one row per asset id"""
+        indptr = [0]
+        indices = []
+        for key in self._id_to_key:
+            indices.extend(self._id[neighbour] for neighbour in graph.get(key, ()))
+            indptr.append(len(indices))
+        return np.asarray(indptr, dtype=np.int32), np.asarray(indices, dtype=np.int32)
+    
+    def _compute_all_closures(self):
+        """Fill the closure caches for every asset in one topological pass"""
+        if self._closures_complete:
+            return
+        
+        # Kahn's algorithm; assets on a cycle never become ready
+        nodes = set(self.assets) | set(self.dependencies) | set(self.downstream)
+        pending = {node: len(self.dependencies.get(node, ())) for node in nodes}
+        ready = [node for node, count in pending.items() if count == 0]
+        order = []
+        while ready:
+            node = ready.pop()
+            order.append(node)
+            for child in self.downstream.get(node, ()):
+                pending[child] -= 1
+                if pending[child] == 0:
+                    ready.append(child)
+        
+        # Parents precede children, so each upstream set is a union of finished ones
+        for node in order:
+            upstream = set()
+            for parent in self.dependencies.get(node, ()):
+                upstream.add(parent)
+                upstream |= self._upstream_cache[parent]
+            self._upstream_cache[node] = frozenset(upstream)
+        
+        # Reverse order for downstream; children on a cycle fall back to a walk
+        for node in reversed(order):
+            downstream = set()
+            for child in self.downstream.get(node, ()):
+                downstream.add(child)
+                downstream |= self.get_downstream_impact(child)
+            self._downstream_cache[node] = frozenset(downstream)
+        
+        self._closures_complete = True
+    
+    def _link_transformation(self, index: int):
+        """Add a stored transformation's edges to the graphs and source index"""
+        transformation = self.transformations[index]
         
+        # Update dependencies and downstream relationships
+        target = transformation.target_asset
+        target_dependencies = self.dependencies[target]
         for source in transformation.source_assets:
-            self.dependencies[target].add(source)
-            
-            # Update downstream relationships
-            if source not in self.downstream:
-                self.downstream[source] = set()
+            target_dependencies.add(source)
             self.downstream[source].add(target)
         
-        self.logger.info(f"Added transformation: {' + '.join(transformation.source_assets)} -> {target}")
+        # Record it under each distinct source asset
+        for source in dict.fromkeys(transformation.source_assets):
+            self._transforms_by_source.setdefault(source, []).append(index)
     
-    def get_upstream_dependencies(self, asset: str, visited: Set[str] = None) -> Set[str]:
+    def _node_id(self, asset_key: str) -> str:
+        """Diagram-safe node id for an asset, sanitized once and cached"""
+        node_id = self._node_ids.get(asset_key)
+        if node_id is None:
+            node_id = asset_key.translate(NODE_ID_TRANSLATION)
+            self._node_ids[asset_key] = node_id
+        return node_id
+    
+    def get_upstream_dependencies(self, asset: str) -> FrozenSet[str]:
         """Get all upstream dependencies for an asset"""
-        if visited is None:
-            visited = set()
-        
-        if asset in visited:
-            return set()  # Avoid circular dependencies
-        
-        visited.add(asset)
-        dependencies = set()
-        
-        direct_deps = self.dependencies.get(asset, set())
-        dependencies.update(direct_deps)
-        
-        # Recursively get dependencies of dependencies
-        for dep in direct_deps:
-            dependencies.update(self.get_upstream_dependencies(dep, visited.copy()))
-        
+        dependencies = self._upstream_cache.get(asset)
+        if dependencies is None:
+            if self._bwd_indptr is not None:
+                reached = self._walk_csr(self._bwd_indptr, self._bwd_indices, asset)
+            else:
+                reached = self._walk(self.dependencies, asset)
+            dependencies = frozenset(reached)
+            self._upstream_cache[asset] = dependencies
         return dependencies
     
-    def get_downstream_impact(self, asset: str, visited: Set[str] = None) -> Set[str]:
+    def get_downstream_impact(self, asset: str) -> FrozenSet[str]:
         """Get all downstream assets affected by changes to this asset"""
-        if visited is None:
-            visited = set()
-        
-        if asset in visited:
-            return set()  # Avoid circular dependencies
-        
-        visited.add(asset)
-        downstream = set()
-        
-        direct_downstream = self.downstream.get(asset, set())
-        downstream.update(direct_downstream)
-        
-        # Recursively get downstream of downstream
-        for ds in direct_downstream:
-            downstream.update(self.get_downstream_impact(ds, visited.copy()))
-        
+        downstream = self._downstream_cache.get(asset)
+        if downstream is None:
+            if self._fwd_indptr is not None:
+                reached = self._walk_csr(self._fwd_indptr, self._fwd_indices, asset)
+            else:
+                reached = self._walk(self.downstream, asset)
+            downstream = frozenset(reached)
+            self._downstream_cache[asset] = downstream
         return downstream
     
+    def _walk(self, graph: Dict[str, Set[str]], asset: str) -> Set[str]:
+        """Collect every asset reachable from an asset along the graph's edges"""
+        # Iterative with one shared visited set; an asset on a cycle reaches itself
+        reached = set()
+        stack = [asset]
+        while stack:
+            current = stack.pop()
+            for neighbour in graph.get(current, ()):
+                if neighbour not in reached:
+                    reached.add(neighbour)
+                    stack.append(neighbour)
+        return reached
+    
+    def _walk_csr(self, indptr: np.ndarray, indices: np.ndarray, asset: str) -> Set[str]:
+        """Same walk as _walk over the frozen CSR arrays, using integer ids"""
+        start = self._id.get(asset)
+        if start is None:
+            return set()
+        
+        id_to_key = self._id_to_key
+        if NUMBA_AVAILABLE:
+            visited = _bfs_csr(indptr, indices, start)
+            return {id_to_key[index] for index in np.flatnonzero(visited).tolist()}
+        
+        visited = bytearray(len(id_to_key))
+        stack = [start]
+        while stack:
+            current = stack.pop()
+            for neighbour in indices[indptr[current]:indptr[current + 1]].tolist():
+                if not visited[neighbour]:
+                    visited[neighbour] = 1
+                    stack.append(neighbour)
+        
+        return {id_to_key[index] for index, seen in enumerate(visited) if seen}
+    
+    def _reachable_from(self, assets: List[str]) -> Set[str]:
+        """Union of the downstream closures of several assets, as boolean vector steps"""
+        seeds = np.zeros(len(self._id_to_key), dtype=bool)
+        seeds[[self._id[asset] for asset in assets if asset in self._id]] = True
+        
+        reached = np.zeros_like(seeds)
+        frontier = self._step_downstream(seeds)
+        while frontier.any():
+            reached |= frontier
+            frontier = self._step_downstream(frontier) & ~reached
+        
+        return {self._id_to_key[index] for index in np.flatnonzero(reached).tolist()}
+    
+    def _step_downstream(self, frontier: np.ndarray) -> np.ndarray:
+        """Assets with at least one dependency in the frontier"""
+        # Count frontier hits per row of the dependency CSR via a prefix sum,
+        # which also copes with rows that have no dependencies
+        hits = np.concatenate(([0], np.cumsum(frontier[self._bwd_indices])))
+        return hits[self._bwd_indptr[1:]] > hits[self._bwd_indptr[:-1]]
+    
     def get_lineage_path(self, source: str, target: str) -> List[str]:
         """Get the lineage path between two assets"""
-        def find_path(current: str, target: str, path: List[str], visited: Set[str]) -> Optional[List[str]]:
-            if current == target:
-                return path + [current]
-            
-            if current in visited:
-                return None
-            
-            visited.add(current)
-            
-            for downstream_asset in self.downstream.get(current, set()):
-                result = find_path(downstream_asset, target, path + [current], visited.copy())
-                if result:
-                    return result
-            
-            return None
-        
-        return find_path(source, target, [], set()) or []
+        if source == target:
+            return [source]
+        
+        # Breadth-first search recording each asset's parent, so the
+        # (shortest) path is rebuilt once at the end
+        parents = {source: None}
+        queue = deque([source])
+        while queue:
+            current = queue.popleft()
+            for downstream_asset in self.downstream.get(current, ()):
+                if downstream_asset in parents:
+                    continue
+                parents[downstream_asset] = current
+                if downstream_asset == target:
+                    path = []
+                    while downstream_asset is not None:
+                        path.append(downstream_asset)
+                        downstream_asset = parents[downstream_asset]
+                    return path[::-1]
+                queue.append(downstream_asset)
+        
+        return []
     
     def analyze_impact(self, changed_assets: List[str]) -> Dict[str, Any]:
         """Analyze the impact of changes to specified assets"""
@@ -153,18 +353,23 @@ class DataLineageTracker:
             'recommendations': []
         }
         
+        if self._bwd_indptr is not None:
+            # Whole change set at once over the frozen graph
+            impact_analysis['affected_assets'] = self._reachable_from(changed_assets)
+        else:
+            for asset in changed_assets:
+                downstream = self.get_downstream_impact(asset)
+                impact_analysis['affected_assets'].update(downstream)
+        
         for asset in changed_assets:
-            downstream = self.get_downstream_impact(asset)
-            impact_analysis['affected_assets'].update(downstream)
-            
             # Find affected transformations
-            for transformation in self.transformations:
-                if asset in transformation.source_assets:
-                    impact_analysis['affected_transformations'].append({
-                        'transformation': transformation.target_asset,
-                        'type': transformation.transformation_type,
-                        'affected_source': asset
-                    })
+            for index in self._transforms_by_source.get(asset, ()):
+                transformation = self.transformations[index]
+                impact_analysis['affected_transformations'].append({
+                    'transformation': transformation.target_asset,
+                    'type': transformation.transformation_type,
+                    'affected_source': asset
+                })
         
         # Determine risk level
         affected_count = len(impact_analysis['affected_assets'])
@@ -194,70 +399,48 @@ class DataLineageTracker:
     
     def _generate_mermaid_diagram(self) -> str:
         """Generate Mermaid diagram syntax"""
-        lines = ['graph TD']
-        
-        # Add nodes
-        for asset_key, asset in self.assets.items():
-            node_id = asset_key.replace('.', '_').replace('-', '_')
-            node_label = f"{asset.name}\\n({asset.type})"
-            
-            if asset.schema == 'bronze':
-                lines.append(f'    {node_id}["{node_label}"]:::bronze')
-            elif asset.schema == 'silver':
-                lines.append(f'    {node_id}["{node_label}"]:::silver') 
-            elif asset.schema == 'gold':
-                lines.append(f'    {node_id}["{node_label}"]:::gold')
-            else:
-                lines.append(f'    {node_id}["{node_label}"]')
-        
-        # Add edges
-        for transformation in self.transformations:
-            target_id = transformation.target_asset.replace('.', '_').replace('-', '_')
-            for source in transformation.source_assets:
-                source_id = source.replace('.', '_').replace('-', '_')
-                lines.append(f'    {source_id} --> {target_id}')
-        
-        # Add styles
-        lines.extend([
-            '',
-            '    classDef bronze fill:#cd7f32,stroke:#8B4513,stroke-width:2px,color:#fff',
-            '    classDef silver fill:#c0c0c0,stroke:#808080,stroke-width:2px,color:#000',
-            '    classDef gold fill:#ffd700,stroke:#daa520,stroke-width:2px,color:#000'
-        ])
-        
-        return '\n'.join(lines)
+        return self._emit_graph(
+            header='graph TD\n',
+            node_tpl='    {node}["{name}\\n({type})"]{style}\n',
+            edge_tpl='    {source} --> {target}\n',
+            footer='\n'
+                   '    classDef bronze fill:#cd7f32,stroke:#8B4513,stroke-width:2px,color:#fff\n'
+                   '    classDef silver fill:#c0c0c0,stroke:#808080,stroke-width:2px,color:#000\n'
+                   '    classDef gold fill:#ffd700,stroke:#daa520,stroke-width:2px,color:#000',
+            schema_map=MERMAID_SCHEMA_CLASS, default_style='')
     
     def _generate_dot_diagram(self) -> str:
         """Generate Graphviz DOT diagram syntax"""
-        lines = ['digraph DataLineage {', '    rankdir=LR;', '    node [shape=box];']
+        return self._emit_graph(
+            header='digraph DataLineage {\n    rankdir=LR;\n    node [shape=box];\n',
+            node_tpl='    {node} [label="{name}\\n({type})", fillcolor="{style}", style=filled];\n',
+            edge_tpl='    {source} -> {target};\n',
+            footer='}',
+            schema_map=DOT_SCHEMA_COLOR, default_style='#CCCCCC')
+    
+    def _emit_graph(self, header: str, node_tpl: str, edge_tpl: str, footer: str,
+                    schema_map: Dict[str, str], default_style: str) -> str:
+        """Write one diagram: a node per asset, then an edge per transformation source"""
+        out = io.StringIO()
+        out.write(header)
         
-        # Add nodes with styling
+        node_id = self._node_id
         for asset_key, asset in self.assets.items():
-            node_id = asset_key.replace('.', '_').replace('-', '_')
-            
-            if asset.schema == 'bronze':
-                color = '#CD7F32'
-            elif asset.schema == 'silver':
-                color = '#C0C0C0'
-            elif asset.schema == 'gold':
-                color = '#FFD700'
-            else:
-                color = '#CCCCCC'
-            
-            lines.append(f'    {node_id} [label="{asset.name}\\n({asset.type})", fillcolor="{color}", style=filled];')
+            out.write(node_tpl.format(node=node_id(asset_key), name=asset.name, type=asset.type,
+                                      style=schema_map.get(asset.schema, default_style)))
         
-        # Add edges
         for transformation in self.transformations:
-            target_id = transformation.target_asset.replace('.', '_').replace('-', '_')
+            target = node_id(transformation.target_asset)
             for source in transformation.source_assets:
-                source_id = source.replace('.', '_').replace('-', '_')
-                lines.append(f'    {source_id} -> {target_id};')
+                out.write(edge_tpl.format(source=node_id(source), target=target))
         
-        lines.append('}')
-        return '\n'.join(lines)
+        out.write(footer)
+        return out.getvalue()
     
     def initialize_warehouse_lineage(self):
         """Initialize lineage for the modern data warehouse"""
+        now = datetime.now().isoformat()
+        
         # Bronze layer assets
         bronze_tables = [
             'crm_cust_info', 'crm_prd_info', 'crm_sales_details',
@@ -269,8 +452,8 @@ class DataLineageTracker:
                 name=table,
                 type='table',
                 schema='bronze',
-                description=f'Raw data from source system',
-                created_date=datetime.now().isoformat(),
+                description='Raw data from source system',
+                created_date=now,
                 owner='ETL Pipeline',
                 tags=['raw', 'bronze', 'source']
             ))
@@ -286,8 +469,8 @@ class DataLineageTracker:
                 name=table,
                 type='table',
                 schema='silver',
-                description=f'Cleansed and standardized data',
-                created_date=datetime.now().isoformat(),
+                description='Cleansed and standardized data',
+                created_date=now,
                 owner='ETL Pipeline',
                 tags=['cleansed', 'silver', 'standardized']
             ))
@@ -305,7 +488,7 @@ class DataLineageTracker:
                 type=obj_type,
                 schema='gold',
                 description=description,
-                created_date=datetime.now().isoformat(),
+                created_date=now,
                 owner='Analytics Team',
                 tags=['analytics', 'gold', 'star-schema']
             ))
@@ -327,7 +510,7 @@ class DataLineageTracker:
                 target_asset=target,
                 transformation_type='etl',
                 transformation_logic=logic,
-                created_date=datetime.now().isoformat(),
+                created_date=now,
                 created_by='silver.load_silver'
             ))
         
@@ -337,7 +520,7 @@ class DataLineageTracker:
             target_asset='gold.dim_customers',
             transformation_type='view',
             transformation_logic='Customer dimension combining CRM and ERP data',
-            created_date=datetime.now().isoformat(),
+            created_date=now,
             created_by='gold.dim_customers view'
         ))
         
@@ -346,7 +529,7 @@ class DataLineageTracker:
             target_asset='gold.dim_products',
             transformation_type='view',
             transformation_logic='Product dimension with category information',
-            created_date=datetime.now().isoformat(),
+            created_date=now,
             created_by='gold.dim_products view'
         ))
         
@@ -355,44 +538,56 @@ class DataLineageTracker:
             target_asset='gold.fact_sales',
             transformation_type='view',
             transformation_logic='Sales fact table with dimension keys',
-            created_date=datetime.now().isoformat(),
+            created_date=now,
             created_by='gold.fact_sales view'
         ))
     
     def save_lineage(self):
         """Save lineage data to file"""
-        lineage_data = {
-            'assets': {k: asdict(v) for k, v in self.assets.items()},
-            'transformations': [asdict(t) for t in self.transformations],
-            'last_updated': datetime.now().isoformat()
-        }
-        
-        Path(self.lineage_file).parent.mkdir(parents=True, exist_ok=True)
-        
-        with open(self.lineage_file, 'w') as f:
-            json.dump(lineage_data, f, indent=2, default=str)
+        if ORJSON_AVAILABLE:
+            # orjson serializes the dataclasses natively, no asdict() pass needed
+            lineage_data = {
+                'assets': self.assets,
+                'transformations': self.transformations,
+                'last_updated': datetime.now().isoformat()
+            }
+            with open(self._path, 'wb') as f:
+                f.write(orjson.dumps(lineage_data, default=str, option=orjson.OPT_INDENT_2))
+        else:
+            lineage_data = {
+                'assets': {k: _shallow_dict(v) for k, v in self.assets.items()},
+                'transformations': [_shallow_dict(t) for t in self.transformations],
+                'last_updated': datetime.now().isoformat()
+            }
+            with open(self._path, 'w') as f:
+                json.dump(lineage_data, f, indent=2, default=str)
         
         self.logger.info(f"Lineage data saved to {self.lineage_file}")
     
     def load_lineage(self):
         """Load lineage data from file"""
-        if not Path(self.lineage_file).exists():
+        if not self._path.exists():
             return
         
         try:
-            with open(self.lineage_file, 'r') as f:
-                lineage_data = json.load(f)
+            if ORJSON_AVAILABLE:
+                # Parse straight from bytes, skipping the text decode and json.load
+                lineage_data = orjson.loads(self._path.read_bytes())
+            else:
+                with open(self._path, 'r') as f:
+                    lineage_data = json.load(f)
             
             # Load assets
             for asset_key, asset_data in lineage_data.get('assets', {}).items():
-                self.assets[asset_key] = DataAsset(**asset_data)
+                self.assets[sys.intern(asset_key)] = DataAsset(**asset_data)
             
-            # Load transformations
+            # Load transformations, extending the graphs as each one arrives
             for transform_data in lineage_data.get('transformations', []):
                 self.transformations.append(DataTransformation(**transform_data))
+                self._link_transformation(len(self.transformations) - 1)
             
-            # Rebuild dependency graphs
-            self._rebuild_dependency_graphs()
+            self._invalidate_closures()
+            self._freeze()
             
             self.logger.info(f"Lineage data loaded from {self.lineage_file}")
             
@@ -403,19 +598,14 @@ class DataLineageTracker:
         """Rebuild dependency and downstream graphs from transformations"""
         self.dependencies.clear()
         self.downstream.clear()
+        self._transforms_by_source.clear()
+        self._invalidate_closures()
         
-        # Initialize all assets
-        for asset_key in self.assets.keys():
-            self.dependencies[asset_key] = set()
-            self.downstream[asset_key] = set()
+        # Rebuild from transformations; assets without edges get no set at all
+        for index in range(len(self.transformations)):
+            self._link_transformation(index)
         
-        # Rebuild from transformations
-        for transformation in self.transformations:
-            target = transformation.target_asset
-            
-            for source in transformation.source_assets:
-                self.dependencies[target].add(source)
-                self.downstream[source].add(target)
+        self._freeze()
     
     def generate_lineage_report(self) -> str:
         """Generate a comprehensive lineage report"""
@@ -448,6 +638,7 @@ class DataLineageTracker:
         report.append("DEPENDENCY ANALYSIS:")
         report.append("-" * 40)
         
+        self._compute_all_closures()
         for asset_key in sorted(self.assets.keys()):
             deps = self.get_upstream_dependencies(asset_key)
             downstream = self.get_downstream_impact(asset_key)
@@ -5,13 +5,166 @@ Analyzes and optimizes data warehouse performance through indexing,
 partitioning, and query optimization recommendations.
 """
 
+import io
 import logging
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Dict, List, Any, Optional, TextIO, Tuple
 from dataclasses import dataclass
 import json
 
-@dataclass
+# Partition column by schema for sales and customer tables
+_SALES_PARTITION_COLUMNS = {'silver': 'sls_order_dt', 'gold': 'order_date'}
+_CUSTOMER_PARTITION_COLUMNS = {'silver': 'cst_create_date'}
+
+# Monthly range partitioning script, filled in per large table
+_PARTITION_SCRIPT_TEMPLATE = """
+-- Create partition function and scheme for {table_name}
+CREATE PARTITION FUNCTION PF_{table}_Monthly (DATE)
+AS RANGE RIGHT FOR VALUES (
+    '2023-01-01', '2023-02-01', '2023-03-01', '2023-04-01',
+    '2023-05-01', '2023-06-01', '2023-07-01', '2023-08-01',
+    '2023-09-01', '2023-10-01', '2023-11-01', '2023-12-01'
+);
+
+CREATE PARTITION SCHEME PS_{table}_Monthly
+AS PARTITION PF_{table}_Monthly ALL TO ([PRIMARY]);
+
+-- Apply to existing table (requires rebuilding)
+CREATE CLUSTERED INDEX IX_{table}_partitioned ON {table_name} ({partition_column})
+ON PS_{table}_Monthly ({partition_column});
+""".strip()
+
+# Benign background waits left out of the wait statistics
+_USEFUL_WAITS_FILTER = """wait_type NOT IN ('CLR_SEMAPHORE', 'LAZYWRITER_SLEEP', 'RESOURCE_QUEUE',
+            'SLEEP_TASK', 'SLEEP_SYSTEMTASK', 'SQLTRACE_BUFFER_FLUSH', 'WAITFOR',
+            'LOGMGR_QUEUE', 'CHECKPOINT_QUEUE', 'REQUEST_FOR_DEADLOCK_SEARCH',
+            'XE_TIMER_EVENT', 'BROKER_TO_FLUSH', 'BROKER_TASK_STOP', 'CLR_MANUAL_EVENT',
+            'CLR_AUTO_EVENT', 'DISPATCHER_QUEUE_SEMAPHORE', 'FT_IFTS_SCHEDULER_IDLE_WAIT',
+            'XE_DISPATCHER_WAIT', 'XE_DISPATCHER_JOIN', 'SQLTRACE_INCREMENTAL_FLUSH_SLEEP')"""
+
+_WAIT_METRIC_PREFIX = 'wait_time_'
+
+_USEFUL_WAITS_VIEW_DDL = f"""
+CREATE OR ALTER VIEW dbo.vw_useful_waits AS
+SELECT wait_type, wait_time_ms, waiting_tasks_count
+FROM sys.dm_os_wait_stats
+WHERE {_USEFUL_WAITS_FILTER}
+"""
+
+# Catalog and DMV queries; the SQL text never changes, so drivers that cache
+# prepared statements by text can reuse them
+_TABLE_STATS_SQL = """
+WITH clustered AS (
+    SELECT
+        object_id,
+        MAX(CASE WHEN type = 1 THEN 1 ELSE 0 END) AS has_clustered
+    FROM sys.indexes
+    GROUP BY object_id
+)
+SELECT 
+    t.TABLE_SCHEMA,
+    t.TABLE_NAME,
+    COALESCE(p.rows, 0) AS row_count,
+    CAST(COALESCE(p.reserved, 0) / 1024.0 AS FLOAT) AS reserved_space_mb,
+    CAST(COALESCE(p.data, 0) / 1024.0 AS FLOAT) AS data_space_mb,
+    CAST(COALESCE(p.index_size, 0) / 1024.0 AS FLOAT) AS index_space_mb,
+    CAST(COALESCE(p.unused, 0) / 1024.0 AS FLOAT) AS unused_space_mb,
+    COALESCE(p.has_clustered, 0) AS has_clustered
+FROM INFORMATION_SCHEMA.TABLES t
+LEFT JOIN (
+    SELECT 
+        s.name AS schema_name,
+        t.name AS table_name,
+        SUM(p.rows) AS rows,
+        SUM(a.total_pages) * 8 AS reserved,
+        SUM(a.used_pages) * 8 AS data,
+        (SUM(a.used_pages) - SUM(p.rows)) * 8 AS index_size,
+        (SUM(a.total_pages) - SUM(a.used_pages)) * 8 AS unused,
+        MAX(c.has_clustered) AS has_clustered
+    FROM sys.tables t
+    INNER JOIN sys.schemas s ON t.schema_id = s.schema_id
+    INNER JOIN sys.partitions p ON t.object_id = p.object_id
+    INNER JOIN sys.allocation_units a ON p.partition_id = a.container_id
+    LEFT JOIN clustered c ON c.object_id = t.object_id
+    WHERE p.index_id <= 1
+    GROUP BY s.name, t.name
+) p ON t.TABLE_SCHEMA = p.schema_name AND t.TABLE_NAME = p.table_name
+WHERE t.TABLE_TYPE = 'BASE TABLE'
+ORDER BY p.rows DESC
+"""
+
+_PK_COLUMNS_SQL = """
+SELECT
+    kcu.TABLE_SCHEMA,
+    kcu.TABLE_NAME,
+    kcu.COLUMN_NAME
+FROM INFORMATION_SCHEMA.TABLE_CONSTRAINTS tc
+INNER JOIN INFORMATION_SCHEMA.KEY_COLUMN_USAGE kcu
+    ON tc.CONSTRAINT_SCHEMA = kcu.CONSTRAINT_SCHEMA
+    AND tc.CONSTRAINT_NAME = kcu.CONSTRAINT_NAME
+WHERE tc.CONSTRAINT_TYPE = 'PRIMARY KEY'
+ORDER BY kcu.TABLE_SCHEMA, kcu.TABLE_NAME, kcu.ORDINAL_POSITION
+"""
+
+_SLOW_QUERIES_SQL = """
+SELECT TOP (?)
+    qs.sql_handle,
+    qs.execution_count,
+    qs.total_elapsed_time / 1000000.0 AS total_elapsed_time_seconds,
+    qs.total_elapsed_time / qs.execution_count / 1000000.0 AS avg_elapsed_time_seconds,
+    qs.total_cpu_time / 1000000.0 AS total_cpu_time_seconds,
+    qs.total_physical_reads,
+    qs.total_logical_reads,
+    LEFT(st.statement_text, 200) AS query_text,
+    CASE WHEN LEN(st.statement_text) > 200 THEN 1 ELSE 0 END AS truncated
+FROM sys.dm_exec_query_stats qs
+CROSS APPLY sys.dm_exec_sql_text(qs.sql_handle) qt
+CROSS APPLY (
+    SELECT SUBSTRING(qt.text, (qs.statement_start_offset/2)+1,
+        ((CASE qs.statement_end_offset
+            WHEN -1 THEN DATALENGTH(qt.text)
+            ELSE qs.statement_end_offset
+        END - qs.statement_start_offset)/2)+1) AS statement_text
+) st
+WHERE qs.total_elapsed_time / qs.execution_count / 1000000.0 > ?
+ORDER BY qs.total_elapsed_time / qs.execution_count DESC
+"""
+
+_DATABASE_SIZE_SQL = """
+SELECT 
+    name AS database_name,
+    size * 8.0 / 1024 AS size_mb,
+    max_size * 8.0 / 1024 AS max_size_mb
+FROM sys.database_files
+WHERE type = 0  -- Data files
+"""
+
+_USEFUL_WAITS_SQL = """
+SELECT TOP 10
+    wait_type,
+    wait_time_ms / 1000.0 AS wait_time_seconds,
+    waiting_tasks_count
+FROM dbo.vw_useful_waits
+ORDER BY wait_time_ms DESC
+"""
+
+_WAIT_STATS_INLINE_SQL = f"""
+SELECT TOP 10
+    wait_type,
+    wait_time_ms / 1000.0 AS wait_time_seconds,
+    waiting_tasks_count
+FROM sys.dm_os_wait_stats
+WHERE {_USEFUL_WAITS_FILTER}
+ORDER BY wait_time_ms DESC
+"""
+
+# Metrics and recommendations are created per row; drop their __dict__ on 3.10+
+DATACLASS_OPTIONS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+@dataclass(**DATACLASS_OPTIONS)
 class PerformanceMetric:
     """Performance metric data structure"""
     metric_name: str
@@ -21,7 +174,7 @@ class PerformanceMetric:
     table_name: Optional[str] = None
     query_id: Optional[str] = None
 
-@dataclass
+@dataclass(**DATACLASS_OPTIONS)
 class IndexRecommendation:
     """Index recommendation data structure"""
     table_name: str
@@ -31,7 +184,7 @@ class IndexRecommendation:
     expected_benefit: str
     creation_script: str
 
-@dataclass
+@dataclass(**DATACLASS_OPTIONS)
 class PartitionRecommendation:
     """Partition recommendation data structure"""
     table_name: str
@@ -44,69 +197,64 @@ class PartitionRecommendation:
 class PerformanceOptimizer:
     """Analyzes and optimizes data warehouse performance"""
     
-    def __init__(self, db_manager=None):
+    # None until the helper views have been attempted, False if the DDL failed
+    _views_created: Optional[bool] = None
+    
+    def __init__(self, db_manager=None, cache_ttl_seconds: float = 300.0):
         from pipelines.config.database import db_manager as default_db_manager
         self.db = db_manager or default_db_manager
         self.logger = logging.getLogger(__name__)
         
+        # Table analysis is catalog-heavy; reuse it across report and scripts
+        self.cache_ttl_seconds = cache_ttl_seconds
+        self._table_analysis_cache: Optional[Tuple[float, List[Dict[str, Any]]]] = None
+        
         # Performance thresholds
         self.thresholds = {
             'slow_query_duration': 5.0,  # seconds
             'high_cpu_percentage': 80.0,  # percent
             'high_io_wait': 100.0,        # milliseconds
             'large_table_rows': 1000000,  # rows
+            'min_interesting_rows': 1000,  # rows; smaller bronze tables are skipped
             'index_scan_ratio': 0.9       # ratio of index seeks to scans
         }
     
+    def invalidate_cache(self):
+        """Forget cached analysis so the next call re-reads the catalog"""
+        self._table_analysis_cache = None
+    
     def analyze_table_performance(self) -> List[Dict[str, Any]]:
         """Analyze performance of all tables in the warehouse"""
+        if self._table_analysis_cache is not None:
+            cached_at, cached_analysis = self._table_analysis_cache
+            if time.monotonic() - cached_at < self.cache_ttl_seconds:
+                return cached_analysis
+        
         performance_analysis = []
         
         try:
-            # Get table statistics
-            query = """
-            SELECT 
-                t.TABLE_SCHEMA,
-                t.TABLE_NAME,
-                p.rows AS row_count,
-                p.reserved AS reserved_space_kb,
-                p.data AS data_space_kb,
-                p.index_size AS index_space_kb,
-                p.unused AS unused_space_kb
-            FROM INFORMATION_SCHEMA.TABLES t
-            LEFT JOIN (
-                SELECT 
-                    s.name AS schema_name,
-                    t.name AS table_name,
-                    SUM(p.rows) AS rows,
-                    SUM(a.total_pages) * 8 AS reserved,
-                    SUM(a.used_pages) * 8 AS data,
-                    (SUM(a.used_pages) - SUM(p.rows)) * 8 AS index_size,
-                    (SUM(a.total_pages) - SUM(a.used_pages)) * 8 AS unused
-                FROM sys.tables t
-                INNER JOIN sys.schemas s ON t.schema_id = s.schema_id
-                INNER JOIN sys.partitions p ON t.object_id = p.object_id
-                INNER JOIN sys.allocation_units a ON p.partition_id = a.container_id
-                WHERE p.index_id <= 1
-                GROUP BY s.name, t.name
-            ) p ON t.TABLE_SCHEMA = p.schema_name AND t.TABLE_NAME = p.table_name
-            WHERE t.TABLE_TYPE = 'BASE TABLE'
-            ORDER BY p.rows DESC
-            """
+            # Key columns for every table in one round-trip, loaded before
+            # the table stats stream holds its connection
+            pk_map = self._bulk_load_pk_map()
             
-            results = self.db.execute_query(query)
+            min_rows = self.thresholds['min_interesting_rows']
             
-            for row in results:
-                table_key = f"{row['TABLE_SCHEMA']}.{row['TABLE_NAME']}"
-                row_count = row['row_count'] or 0
+            # Get table statistics
+            for (schema, table, row_count, reserved_mb, data_mb, index_mb, unused_mb,
+                 has_clustered) in self.db.execute_query_rows(_TABLE_STATS_SQL, fetch_tuples=True):
+                table_key = f"{schema}.{table}"
+                
+                # Small tables outside silver/gold get no recommendations worth reporting
+                if row_count < min_rows and schema not in ('silver', 'gold'):
+                    continue
                 
                 analysis = {
                     'table': table_key,
                     'row_count': row_count,
-                    'reserved_space_mb': (row['reserved_space_kb'] or 0) / 1024,
-                    'data_space_mb': (row['data_space_kb'] or 0) / 1024,
-                    'index_space_mb': (row['index_space_kb'] or 0) / 1024,
-                    'unused_space_mb': (row['unused_space_kb'] or 0) / 1024,
+                    'reserved_space_mb': reserved_mb,
+                    'data_space_mb': data_mb,
+                    'index_space_mb': index_mb,
+                    'unused_space_mb': unused_mb,
                     'performance_issues': [],
                     'recommendations': []
                 }
@@ -117,39 +265,43 @@ class PerformanceOptimizer:
                     analysis['recommendations'].append(self._generate_partition_recommendation(table_key))
                 
                 # Check for missing indexes (simplified check)
-                index_recommendations = self._analyze_missing_indexes(table_key)
+                index_recommendations = self._analyze_missing_indexes(table_key, bool(has_clustered), pk_map)
                 if index_recommendations:
                     analysis['recommendations'].extend(index_recommendations)
                 
                 performance_analysis.append(analysis)
             
+            self._table_analysis_cache = (time.monotonic(), performance_analysis)
             return performance_analysis
             
         except Exception as e:
             self.logger.error(f"Error analyzing table performance: {str(e)}")
             return []
     
-    def _analyze_missing_indexes(self, table_name: str) -> List[IndexRecommendation]:
+    def _bulk_load_pk_map(self) -> Dict[Tuple[str, str], List[str]]:
+        """Primary key columns in key order, keyed by (schema, table)"""
+        try:
+            pk_map = {}
+            for row in self.db.execute_query(_PK_COLUMNS_SQL):
+                pk_map.setdefault((row['TABLE_SCHEMA'], row['TABLE_NAME']), []).append(row['COLUMN_NAME'])
+            return pk_map
+            
+        except Exception as e:
+            self.logger.error(f"Error loading primary key columns: {str(e)}")
+            return {}
+    
+    def _analyze_missing_indexes(self, table_name: str, has_clustered: bool,
+                                 pk_map: Dict[Tuple[str, str], List[str]]) -> List[IndexRecommendation]:
         """Analyze missing indexes for a table"""
         recommendations = []
         
         try:
             schema, table = table_name.split('.')
+            table_lower = table.lower()
             
-            # Check if table has clustered index
-            clustered_check_query = """
-            SELECT COUNT(*) as clustered_count
-            FROM sys.indexes i
-            INNER JOIN sys.tables t ON i.object_id = t.object_id
-            INNER JOIN sys.schemas s ON t.schema_id = s.schema_id
-            WHERE s.name = ? AND t.name = ? AND i.type = 1
-            """
-            
-            result = self.db.execute_query(clustered_check_query, (schema, table))
-            
-            if result and result[0]['clustered_count'] == 0:
+            if not has_clustered:
                 # Table doesn't have clustered index
-                primary_key_columns = self._get_primary_key_columns(table_name)
+                primary_key_columns = pk_map.get((schema, table), [])
                 
                 if primary_key_columns:
                     recommendations.append(IndexRecommendation(
@@ -162,7 +314,7 @@ class PerformanceOptimizer:
                     ))
             
             # Recommend common indexes based on table type and schema
-            if schema == 'silver' and 'sales' in table.lower():
+            if schema == 'silver' and 'sales' in table_lower:
                 recommendations.append(IndexRecommendation(
                     table_name=table_name,
                     index_type='nonclustered',
@@ -172,7 +324,7 @@ class PerformanceOptimizer:
                     creation_script=f"CREATE NONCLUSTERED INDEX IX_{table}_customer_date ON {table_name} (sls_cust_id, sls_order_dt)"
                 ))
             
-            if schema == 'gold' and 'fact' in table.lower():
+            if schema == 'gold' and 'fact' in table_lower:
                 recommendations.append(IndexRecommendation(
                     table_name=table_name,
                     index_type='columnstore',
@@ -187,41 +339,18 @@ class PerformanceOptimizer:
         
         return recommendations
     
-    def _get_primary_key_columns(self, table_name: str) -> List[str]:
-        """Get primary key columns for a table"""
-        try:
-            schema, table = table_name.split('.')
-            
-            query = """
-            SELECT c.COLUMN_NAME
-            FROM INFORMATION_SCHEMA.TABLE_CONSTRAINTS tc
-            INNER JOIN INFORMATION_SCHEMA.CONSTRAINT_COLUMN_USAGE ccu ON tc.CONSTRAINT_NAME = ccu.CONSTRAINT_NAME
-            INNER JOIN INFORMATION_SCHEMA.COLUMNS c ON ccu.COLUMN_NAME = c.COLUMN_NAME AND ccu.TABLE_NAME = c.TABLE_NAME
-            WHERE tc.TABLE_SCHEMA = ? AND tc.TABLE_NAME = ? AND tc.CONSTRAINT_TYPE = 'PRIMARY KEY'
-            ORDER BY c.ORDINAL_POSITION
-            """
-            
-            results = self.db.execute_query(query, (schema, table))
-            return [row['COLUMN_NAME'] for row in results] if results else []
-            
-        except Exception as e:
-            self.logger.error(f"Error getting primary key columns for {table_name}: {str(e)}")
-            return []
-    
     def _generate_partition_recommendation(self, table_name: str) -> PartitionRecommendation:
         """Generate partition recommendation for large tables"""
         schema, table = table_name.split('.')
+        table_lower = table.lower()
         
         # Determine partition column based on table type
-        partition_column = 'dwh_create_date'  # Default for Silver tables
-        
-        if 'sales' in table.lower():
-            if schema == 'silver':
-                partition_column = 'sls_order_dt'
-            elif schema == 'gold':
-                partition_column = 'order_date'
-        elif 'customer' in table.lower():
-            partition_column = 'cst_create_date' if schema == 'silver' else 'create_date'
+        if 'sales' in table_lower:
+            partition_column = _SALES_PARTITION_COLUMNS.get(schema, 'dwh_create_date')
+        elif 'customer' in table_lower:
+            partition_column = _CUSTOMER_PARTITION_COLUMNS.get(schema, 'create_date')
+        else:
+            partition_column = 'dwh_create_date'  # Default for Silver tables
         
         return PartitionRecommendation(
             table_name=table_name,
@@ -229,62 +358,31 @@ class PerformanceOptimizer:
             partition_strategy='range',
             partition_count=12,  # Monthly partitions
             reason='Large table benefits from date-based partitioning',
-            creation_script=f"""
--- Create partition function and scheme for {table_name}
-CREATE PARTITION FUNCTION PF_{table}_Monthly (DATE)
-AS RANGE RIGHT FOR VALUES (
-    '2023-01-01', '2023-02-01', '2023-03-01', '2023-04-01',
-    '2023-05-01', '2023-06-01', '2023-07-01', '2023-08-01',
-    '2023-09-01', '2023-10-01', '2023-11-01', '2023-12-01'
-);
-
-CREATE PARTITION SCHEME PS_{table}_Monthly
-AS PARTITION PF_{table}_Monthly ALL TO ([PRIMARY]);
-
--- Apply to existing table (requires rebuilding)
-CREATE CLUSTERED INDEX IX_{table}_partitioned ON {table_name} ({partition_column})
-ON PS_{table}_Monthly ({partition_column});
-            """.strip()
+            creation_script=_PARTITION_SCRIPT_TEMPLATE.format(
+                table=table, table_name=table_name, partition_column=partition_column)
         )
     
-    def analyze_query_performance(self) -> List[Dict[str, Any]]:
-        """Analyze slow-running queries"""
+    def analyze_query_performance(self, top_n: int = 20) -> List[Dict[str, Any]]:
+        """Analyze the top_n slowest-running queries"""
         slow_queries = []
         
         try:
             # Query to find slow queries from query store or DMVs
-            query = """
-            SELECT TOP 20
-                qs.sql_handle,
-                qs.execution_count,
-                qs.total_elapsed_time / 1000000.0 AS total_elapsed_time_seconds,
-                qs.total_elapsed_time / qs.execution_count / 1000000.0 AS avg_elapsed_time_seconds,
-                qs.total_cpu_time / 1000000.0 AS total_cpu_time_seconds,
-                qs.total_physical_reads,
-                qs.total_logical_reads,
-                SUBSTRING(qt.text, (qs.statement_start_offset/2)+1,
-                    ((CASE qs.statement_end_offset
-                        WHEN -1 THEN DATALENGTH(qt.text)
-                        ELSE qs.statement_end_offset
-                    END - qs.statement_start_offset)/2)+1) AS query_text
-            FROM sys.dm_exec_query_stats qs
-            CROSS APPLY sys.dm_exec_sql_text(qs.sql_handle) qt
-            WHERE qs.total_elapsed_time / qs.execution_count / 1000000.0 > ?
-            ORDER BY qs.total_elapsed_time / qs.execution_count DESC
-            """
-            
-            results = self.db.execute_query(query, (self.thresholds['slow_query_duration'],))
-            
-            for row in results:
+            # TOP is bound as a parameter so the statement text stays the same
+            params = (int(top_n), self.thresholds['slow_query_duration'])
+            rows = self.db.execute_query_rows(_SLOW_QUERIES_SQL, params, fetch_tuples=True)
+            for (_, execution_count, total_seconds, avg_seconds, cpu_seconds, physical_reads,
+                 logical_reads, query_text, truncated) in rows:
                 slow_queries.append({
-                    'query_text': row['query_text'][:200] + '...' if len(row['query_text']) > 200 else row['query_text'],
-                    'execution_count': row['execution_count'],
-                    'avg_duration_seconds': round(row['avg_elapsed_time_seconds'], 3),
-                    'total_duration_seconds': round(row['total_elapsed_time_seconds'], 3),
-                    'total_cpu_seconds': round(row['total_cpu_time_seconds'], 3),
-                    'total_physical_reads': row['total_physical_reads'],
-                    'total_logical_reads': row['total_logical_reads'],
-                    'optimization_suggestions': self._generate_query_optimization_suggestions(row)
+                    'query_text': query_text + '...' if truncated else query_text,
+                    'execution_count': execution_count,
+                    'avg_duration_seconds': round(avg_seconds, 3),
+                    'total_duration_seconds': round(total_seconds, 3),
+                    'total_cpu_seconds': round(cpu_seconds, 3),
+                    'total_physical_reads': physical_reads,
+                    'total_logical_reads': logical_reads,
+                    'optimization_suggestions': self._generate_query_optimization_suggestions(
+                        execution_count, avg_seconds, cpu_seconds, physical_reads, logical_reads)
                 })
             
         except Exception as e:
@@ -292,119 +390,133 @@ ON PS_{table}_Monthly ({partition_column});
         
         return slow_queries
     
-    def _generate_query_optimization_suggestions(self, query_stats: Dict[str, Any]) -> List[str]:
+    def _generate_query_optimization_suggestions(self, execution_count: int, avg_elapsed_seconds: float,
+                                                 total_cpu_seconds: float, total_physical_reads: int,
+                                                 total_logical_reads: int) -> List[str]:
         """Generate optimization suggestions for a slow query"""
         suggestions = []
         
         # High CPU usage
-        if query_stats['total_cpu_seconds'] > 10:
+        if total_cpu_seconds > 10:
             suggestions.append("Consider adding appropriate indexes to reduce CPU usage")
         
         # High physical reads
-        if query_stats['total_physical_reads'] > 1000000:
+        if total_physical_reads > 1000000:
             suggestions.append("High physical reads - consider index optimization or query rewriting")
         
         # High logical reads
-        if query_stats['total_logical_reads'] > 10000000:
+        if total_logical_reads > 10000000:
             suggestions.append("High logical reads - review query for unnecessary data access")
         
         # Frequent execution with slow performance
-        if query_stats['execution_count'] > 1000 and query_stats['avg_elapsed_time_seconds'] > 1:
+        if execution_count > 1000 and avg_elapsed_seconds > 1:
             suggestions.append("Frequently executed slow query - high priority for optimization")
         
         return suggestions
     
-    def generate_optimization_report(self) -> str:
+    def generate_optimization_report(self, table_analysis: Optional[List[Dict[str, Any]]] = None,
+                                     slow_queries: Optional[List[Dict[str, Any]]] = None,
+                                     generated_at: Optional[str] = None) -> str:
         """Generate a comprehensive performance optimization report"""
-        report = []
-        report.append("=" * 80)
-        report.append("PERFORMANCE OPTIMIZATION REPORT")
-        report.append("=" * 80)
-        report.append(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        report.append("")
+        if generated_at is None:
+            generated_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        
+        buf = io.StringIO()
+        w = buf.write
+        w("=" * 80 + "\n")
+        w("PERFORMANCE OPTIMIZATION REPORT\n")
+        w("=" * 80 + "\n")
+        w(f"Generated: {generated_at}\n")
+        w("\n")
         
         # Table performance analysis
-        table_analysis = self.analyze_table_performance()
+        if table_analysis is None:
+            table_analysis = self.analyze_table_performance()
         
         if table_analysis:
-            report.append("TABLE PERFORMANCE ANALYSIS:")
-            report.append("-" * 50)
+            w("TABLE PERFORMANCE ANALYSIS:\n")
+            w("-" * 50 + "\n")
             
             for analysis in table_analysis:
-                report.append(f"\n{analysis['table']}:")
-                report.append(f"  Rows: {analysis['row_count']:,}")
-                report.append(f"  Data Size: {analysis['data_space_mb']:.1f} MB")
-                report.append(f"  Index Size: {analysis['index_space_mb']:.1f} MB")
+                w(f"\n{analysis['table']}:\n")
+                w(f"  Rows: {analysis['row_count']:,}\n")
+                w(f"  Data Size: {analysis['data_space_mb']:.1f} MB\n")
+                w(f"  Index Size: {analysis['index_space_mb']:.1f} MB\n")
                 
                 if analysis['performance_issues']:
-                    report.append("  Issues:")
+                    w("  Issues:\n")
                     for issue in analysis['performance_issues']:
-                        report.append(f"    • {issue}")
+                        w(f"    • {issue}\n")
                 
                 if analysis['recommendations']:
-                    report.append("  Recommendations:")
+                    w("  Recommendations:\n")
                     for rec in analysis['recommendations']:
                         if isinstance(rec, IndexRecommendation):
-                            report.append(f"    • Index: {rec.index_type} on {', '.join(rec.columns)}")
-                            report.append(f"      Reason: {rec.reason}")
+                            w(f"    • Index: {rec.index_type} on {', '.join(rec.columns)}\n")
+                            w(f"      Reason: {rec.reason}\n")
                         elif isinstance(rec, PartitionRecommendation):
-                            report.append(f"    • Partition: {rec.partition_strategy} on {rec.partition_column}")
-                            report.append(f"      Reason: {rec.reason}")
+                            w(f"    • Partition: {rec.partition_strategy} on {rec.partition_column}\n")
+                            w(f"      Reason: {rec.reason}\n")
         
         # Query performance analysis
-        slow_queries = self.analyze_query_performance()
+        if slow_queries is None:
+            slow_queries = self.analyze_query_performance(top_n=5)
         
         if slow_queries:
-            report.append("\n\nSLOW QUERY ANALYSIS:")
-            report.append("-" * 50)
+            w("\n\nSLOW QUERY ANALYSIS:\n")
+            w("-" * 50 + "\n")
             
             for i, query in enumerate(slow_queries[:5], 1):  # Top 5 slow queries
-                report.append(f"\n{i}. Slow Query:")
-                report.append(f"   Average Duration: {query['avg_duration_seconds']} seconds")
-                report.append(f"   Execution Count: {query['execution_count']:,}")
-                report.append(f"   Query: {query['query_text']}")
+                w(f"\n{i}. Slow Query:\n")
+                w(f"   Average Duration: {query['avg_duration_seconds']} seconds\n")
+                w(f"   Execution Count: {query['execution_count']:,}\n")
+                w(f"   Query: {query['query_text']}\n")
                 
                 if query['optimization_suggestions']:
-                    report.append("   Suggestions:")
+                    w("   Suggestions:\n")
                     for suggestion in query['optimization_suggestions']:
-                        report.append(f"     • {suggestion}")
+                        w(f"     • {suggestion}\n")
         
         # Overall recommendations
-        report.append("\n\nOVERALL RECOMMENDATIONS:")
-        report.append("-" * 50)
-        report.append("• Implement recommended indexes to improve query performance")
-        report.append("• Consider partitioning large tables for better maintenance")
-        report.append("• Monitor query execution plans for optimization opportunities")
-        report.append("• Regular statistics updates for optimal query plans")
-        report.append("• Consider columnstore indexes for analytical workloads")
+        w("\n\nOVERALL RECOMMENDATIONS:\n")
+        w("-" * 50 + "\n")
+        w("• Implement recommended indexes to improve query performance\n")
+        w("• Consider partitioning large tables for better maintenance\n")
+        w("• Monitor query execution plans for optimization opportunities\n")
+        w("• Regular statistics updates for optimal query plans\n")
+        w("• Consider columnstore indexes for analytical workloads")
         
-        return "\n".join(report)
+        return buf.getvalue()
     
-    def generate_index_creation_scripts(self) -> str:
-        """Generate SQL scripts for all recommended indexes"""
-        scripts = []
-        scripts.append("-- Performance Optimization Index Creation Scripts")
-        scripts.append("-- Generated: " + datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
-        scripts.append("")
+    def generate_index_creation_scripts(self, fh: TextIO,
+                                        table_analysis: Optional[List[Dict[str, Any]]] = None,
+                                        generated_at: Optional[str] = None) -> None:
+        """Write SQL scripts for all recommended indexes to an open text file"""
+        if generated_at is None:
+            generated_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         
-        table_analysis = self.analyze_table_performance()
+        w = fh.write
+        w("-- Performance Optimization Index Creation Scripts\n")
+        w("-- Generated: " + generated_at + "\n")
+        w("\n")
+        
+        if table_analysis is None:
+            table_analysis = self.analyze_table_performance()
         
         for analysis in table_analysis:
             if analysis['recommendations']:
-                scripts.append(f"-- Indexes for {analysis['table']}")
-                scripts.append("-" * 50)
+                w(f"-- Indexes for {analysis['table']}\n")
+                w("-" * 50 + "\n")
                 
                 for rec in analysis['recommendations']:
                     if isinstance(rec, IndexRecommendation):
-                        scripts.append(f"-- {rec.reason}")
-                        scripts.append(rec.creation_script + ";")
-                        scripts.append("")
+                        w(f"-- {rec.reason}\n")
+                        w(rec.creation_script + ";\n")
+                        w("\n")
                     elif isinstance(rec, PartitionRecommendation):
-                        scripts.append(f"-- {rec.reason}")
-                        scripts.append(rec.creation_script)
-                        scripts.append("")
-        
-        return "\n".join(scripts)
+                        w(f"-- {rec.reason}\n")
+                        w(rec.creation_script + "\n")
+                        w("\n")
     
     def collect_performance_metrics(self) -> List[PerformanceMetric]:
         """Collect current performance metrics"""
@@ -412,69 +524,77 @@ ON PS_{table}_Monthly ({partition_column});
         timestamp = datetime.now().isoformat()
         
         try:
-            # Database size metrics
-            size_query = """
-            SELECT 
-                name AS database_name,
-                size * 8.0 / 1024 AS size_mb,
-                max_size * 8.0 / 1024 AS max_size_mb
-            FROM sys.database_files
-            WHERE type = 0  -- Data files
-            """
+            # The two DMV queries are independent; run them on separate pooled
+            # connections unless the pool only allows one (or its size is unknown)
+            config = getattr(self.db, 'config', None)
+            if config is not None and config.pool_size + config.max_overflow > 1:
+                max_workers = 2
+            else:
+                max_workers = 1
             
-            results = self.db.execute_query(size_query)
-            for row in results:
-                metrics.append(PerformanceMetric(
-                    metric_name='database_size_mb',
-                    value=row['size_mb'],
-                    unit='MB',
-                    timestamp=timestamp
-                ))
-            
-            # Wait statistics
-            wait_stats_query = """
-            SELECT TOP 10
-                wait_type,
-                wait_time_ms / 1000.0 AS wait_time_seconds,
-                waiting_tasks_count
-            FROM sys.dm_os_wait_stats
-            WHERE wait_type NOT IN ('CLR_SEMAPHORE', 'LAZYWRITER_SLEEP', 'RESOURCE_QUEUE',
-                'SLEEP_TASK', 'SLEEP_SYSTEMTASK', 'SQLTRACE_BUFFER_FLUSH', 'WAITFOR',
-                'LOGMGR_QUEUE', 'CHECKPOINT_QUEUE', 'REQUEST_FOR_DEADLOCK_SEARCH',
-                'XE_TIMER_EVENT', 'BROKER_TO_FLUSH', 'BROKER_TASK_STOP', 'CLR_MANUAL_EVENT',
-                'CLR_AUTO_EVENT', 'DISPATCHER_QUEUE_SEMAPHORE', 'FT_IFTS_SCHEDULER_IDLE_WAIT',
-                'XE_DISPATCHER_WAIT', 'XE_DISPATCHER_JOIN', 'SQLTRACE_INCREMENTAL_FLUSH_SLEEP')
-            ORDER BY wait_time_ms DESC
-            """
-            
-            wait_results = self.db.execute_query(wait_stats_query)
-            for row in wait_results:
-                metrics.append(PerformanceMetric(
-                    metric_name=f'wait_time_{row["wait_type"].lower()}',
-                    value=row['wait_time_seconds'],
-                    unit='seconds',
-                    timestamp=timestamp
-                ))
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                size_future = executor.submit(self._collect_size_metrics, timestamp)
+                wait_future = executor.submit(self._collect_wait_metrics, timestamp)
+                metrics.extend(size_future.result())
+                metrics.extend(wait_future.result())
             
         except Exception as e:
             self.logger.error(f"Error collecting performance metrics: {str(e)}")
         
         return metrics
+    
+    def _collect_size_metrics(self, timestamp: str) -> List[PerformanceMetric]:
+        """Database size metrics"""
+        return [
+            PerformanceMetric(
+                metric_name='database_size_mb',
+                value=row['size_mb'],
+                unit='MB',
+                timestamp=timestamp
+            )
+            for row in self.db.execute_query_rows(_DATABASE_SIZE_SQL)
+        ]
+    
+    def ensure_helper_views(self) -> bool:
+        """Create the server-side helper views on first use"""
+        if PerformanceOptimizer._views_created is None:
+            try:
+                self.db.execute_non_query(_USEFUL_WAITS_VIEW_DDL)
+                PerformanceOptimizer._views_created = True
+            except Exception as e:
+                self.logger.warning(f"Helper views unavailable, filtering waits inline: {str(e)}")
+                PerformanceOptimizer._views_created = False
+        
+        return PerformanceOptimizer._views_created
+    
+    def _collect_wait_metrics(self, timestamp: str) -> List[PerformanceMetric]:
+        """Wait statistics"""
+        wait_stats_sql = _USEFUL_WAITS_SQL if self.ensure_helper_views() else _WAIT_STATS_INLINE_SQL
+        return [
+            PerformanceMetric(
+                metric_name=_WAIT_METRIC_PREFIX + row['wait_type'].lower(),
+                value=row['wait_time_seconds'],
+                unit='seconds',
+                timestamp=timestamp
+            )
+            for row in self.db.execute_query_rows(wait_stats_sql)
+        ]
 
 def main():
     """Demo the performance optimizer"""
     optimizer = PerformanceOptimizer()
     
+    # Analyze tables once for both the report and the scripts, stamped alike
+    table_analysis = optimizer.analyze_table_performance()
+    generated_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    
     # Generate optimization report
-    report = optimizer.generate_optimization_report()
+    report = optimizer.generate_optimization_report(table_analysis, generated_at=generated_at)
     print(report)
     
-    # Generate index creation scripts
-    scripts = optimizer.generate_index_creation_scripts()
-    
-    # Save scripts to file
-    with open('performance_optimization_scripts.sql', 'w') as f:
-        f.write(scripts)
+    # Stream index creation scripts to file through a 1 MB write buffer
+    with open('performance_optimization_scripts.sql', 'w', buffering=1 << 20) as f:
+        optimizer.generate_index_creation_scripts(f, table_analysis, generated_at=generated_at)
     
     print(f"\nIndex creation scripts saved to performance_optimization_scripts.sql")
     
@@ -5,13 +5,31 @@ This module handles database connections and configuration settings
 for the data warehouse ETL pipeline.
 """
 
+import copy
 import os
-import yaml
-from typing import Dict, Any
+import sys
+from typing import Dict, Any, Tuple
 from dataclasses import dataclass
+from functools import lru_cache
 import logging
 
-@dataclass
+# Parsed config files keyed by path, with the mtime they were parsed at
+_CONFIG_CACHE: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+
+@lru_cache(maxsize=None)
+def _yaml_codec():
+    """PyYAML with libyaml's C loader/dumper when available, imported on first use"""
+    import yaml
+    try:
+        from yaml import CSafeLoader as loader, CSafeDumper as dumper
+    except ImportError:
+        from yaml import SafeLoader as loader, SafeDumper as dumper
+    return yaml, loader, dumper
+
+# dataclass(slots=True) needs Python 3.10
+DATACLASS_OPTIONS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+@dataclass(**DATACLASS_OPTIONS)
 class DatabaseConfig:
     """Database configuration settings"""
     server: str
@@ -20,6 +38,9 @@ class DatabaseConfig:
     password: str = None
     trusted_connection: bool = True
     driver: str = "ODBC Driver 17 for SQL Server"
+    pool_size: int = 25
+    max_overflow: int = 25
+    pool_recycle: int = 1800
     
 class ConfigManager:
     """Manages configuration settings for the data warehouse"""
@@ -32,8 +53,15 @@ class ConfigManager:
         """Load configuration from YAML file"""
         try:
             if os.path.exists(self.config_path):
-                with open(self.config_path, 'r') as file:
-                    return yaml.safe_load(file)
+                mtime = os.stat(self.config_path).st_mtime
+                entry = _CONFIG_CACHE.get(self.config_path)
+                if entry is None or entry[0] != mtime:
+                    yaml, loader, _ = _yaml_codec()
+                    with open(self.config_path, 'r') as file:
+                        entry = (mtime, yaml.load(file, Loader=loader))
+                    _CONFIG_CACHE[self.config_path] = entry
+                # Each manager gets its own copy to modify and save
+                return copy.deepcopy(entry[1])
             else:
                 # Return default configuration if file doesn't exist
                 return self._get_default_config()
@@ -81,7 +109,10 @@ class ConfigManager:
             username=db_config.get('username'),
             password=db_config.get('password'),
             trusted_connection=db_config.get('trusted_connection', True),
-            driver=db_config.get('driver', 'ODBC Driver 17 for SQL Server')
+            driver=db_config.get('driver', 'ODBC Driver 17 for SQL Server'),
+            pool_size=db_config.get('pool_size', 25),
+            max_overflow=db_config.get('max_overflow', 25),
+            pool_recycle=db_config.get('pool_recycle', 1800)
         )
     
     def get_logging_config(self) -> Dict[str, Any]:
@@ -104,12 +135,21 @@ class ConfigManager:
         """Save configuration to YAML file"""
         try:
             config_to_save = config or self.config
+            yaml, _, dumper = _yaml_codec()
             os.makedirs(os.path.dirname(self.config_path), exist_ok=True)
             with open(self.config_path, 'w') as file:
-                yaml.dump(config_to_save, file, default_flow_style=False, indent=2)
+                yaml.dump(config_to_save, file, Dumper=dumper, default_flow_style=False, indent=2)
             logging.info(f"Configuration saved to {self.config_path}")
         except Exception as e:
             logging.error(f"Error saving configuration: {str(e)}")
 
-# Global configuration instance
-config_manager = ConfigManager()
\ No newline at end of file
+# Global configuration instance, created on first access
+_config_manager = None
+
+def __getattr__(name):
+    global _config_manager
+    if name == 'config_manager':
+        if _config_manager is None:
+            _config_manager = ConfigManager()
+        return _config_manager
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
@@ -4,21 +4,100 @@ Modern Data Warehouse - Database Connection Manager
 This module handles database connections and operations for the data warehouse.
 """
 
-import pyodbc
+import atexit
 import pandas as pd
 import logging
+import threading
+import time
+from collections import OrderedDict
 from contextlib import contextmanager
-from typing import Optional, List, Dict, Any, Union
-from .config import config_manager, DatabaseConfig
+from urllib.parse import quote_plus
+from sqlalchemy import create_engine
+from typing import Optional, List, Dict, Any, Union, Iterator, Tuple
+from .config import DatabaseConfig
+
+try:
+    from sqlalchemy_mssql_bulkcopy import bulkcopy_insert_method
+    BULKCOPY_AVAILABLE = True
+except ImportError:
+    BULKCOPY_AVAILABLE = False
+
+# Parameterized statements kept prepared per pooled connection
+STATEMENT_CACHE_SIZE = 32
+
+# Row count above which bulk_copy_dataframe switches from executemany to BCP
+BULKCOPY_MIN_ROWS = 50_000
 
 class DatabaseManager:
     """Manages database connections and operations"""
     
-    def __init__(self, config: DatabaseConfig = None):
-        self.config = config or config_manager.get_database_config()
+    def __init__(self, config: DatabaseConfig = None, metadata_ttl_seconds: float = 300.0):
+        if config is None:
+            from .config import config_manager
+            config = config_manager.get_database_config()
+        self.config = config
+        self._connection_string = self._build_connection_string()
         self.logger = logging.getLogger(__name__)
+        self._engine = None
+        self._engine_lock = threading.Lock()
+        
+        # Schema and table listings rarely change during a run
+        self.metadata_ttl_seconds = metadata_ttl_seconds
+        self._meta_cache: Dict[tuple, Tuple[float, list]] = {}
+    
+    @property
+    def engine(self):
+        """SQLAlchemy engine whose pool hands out pyodbc connections"""
+        if self._engine is None:
+            with self._engine_lock:
+                if self._engine is None:
+                    self._engine = create_engine(
+                        "mssql+pyodbc:///?odbc_connect=" + quote_plus(self.get_connection_string()),
+                        pool_size=self.config.pool_size,
+                        max_overflow=self.config.max_overflow,
+                        pool_recycle=self.config.pool_recycle,
+                        pool_pre_ping=True,
+                        # Send executemany parameter sets as arrays, not row by row
+                        fast_executemany=True
+                    )
+                    atexit.register(self.close_pool)
+        return self._engine
+    
+    def close_pool(self):
+        """Close every pooled connection; the next query opens a fresh pool"""
+        with self._engine_lock:
+            engine, self._engine = self._engine, None
+        if engine is not None:
+            atexit.unregister(self.close_pool)
+            engine.dispose()
+            self.logger.debug("Database connection pool closed")
         
     def get_connection_string(self) -> str:
+        """Connection string built from the current configuration"""
+        return self._connection_string
+    
+    def reconfigure(self, config: DatabaseConfig = None):
+        """Apply new settings (or re-read them) and rebuild the connection pool"""
+        if config is None:
+            from .config import config_manager
+            config = config_manager.get_database_config()
+        self.config = config
+        self._connection_string = self._build_connection_string()
+        self.clear_metadata_cache()
+        self.close_pool()
+    
+    def clear_metadata_cache(self):
+        """Forget cached schema and table listings, e.g. after DDL"""
+        self._meta_cache.clear()
+    
+    def _cached_metadata(self, key: tuple) -> Optional[list]:
+        """Cached metadata result for key, or None if missing or expired"""
+        entry = self._meta_cache.get(key)
+        if entry is not None and time.monotonic() - entry[0] < self.metadata_ttl_seconds:
+            return list(entry[1])
+        return None
+    
+    def _build_connection_string(self) -> str:
         """Build connection string based on configuration"""
         if self.config.trusted_connection:
             return (
@@ -36,14 +115,36 @@ class DatabaseManager:
                 f"PWD={self.config.password};"
             )
     
+    def _prepared_cursor(self, conn, query: str):
+        """Cursor kept on the pooled connection for one parameterized SQL text"""
+        # pyodbc skips SQLPrepare when a cursor re-executes the SQL it last ran.
+        # The pool's per-connection info dict is cleared on reconnect.
+        cursors = conn.info.get('prepared_cursors')
+        if cursors is None:
+            cursors = conn.info['prepared_cursors'] = OrderedDict()
+        
+        cursor = cursors.pop(query, None)
+        if cursor is None:
+            cursor = conn.cursor()
+            if len(cursors) >= STATEMENT_CACHE_SIZE:
+                cursors.popitem(last=False)[1].close()
+        cursors[query] = cursor
+        return cursor
+    
+    def _discard_cursor(self, conn, query: str, cursor):
+        """Close a cursor and drop it from the connection's statement cache"""
+        cursors = conn.info.get('prepared_cursors')
+        if cursors is not None and cursors.get(query) is cursor:
+            del cursors[query]
+        cursor.close()
+    
     @contextmanager
     def get_connection(self):
-        """Context manager for database connections"""
+        """Context manager for pooled database connections"""
         connection = None
         try:
-            connection_string = self.get_connection_string()
-            connection = pyodbc.connect(connection_string)
-            self.logger.debug("Database connection established")
+            connection = self.engine.raw_connection()
+            self.logger.debug("Database connection checked out from pool")
             yield connection
         except Exception as e:
             self.logger.error(f"Database connection error: {str(e)}")
@@ -51,10 +152,41 @@ class DatabaseManager:
         finally:
             if connection:
                 connection.close()
-                self.logger.debug("Database connection closed")
+                self.logger.debug("Database connection returned to pool")
+    
+    def execute_query(self, query: str, params: tuple = None,
+                      fetch_tuples: bool = False) -> Union[List[Dict[str, Any]], List[Any]]:
+        """Execute SELECT query and return results as list of dictionaries (or driver rows)"""
+        try:
+            with self.get_connection() as conn:
+                if params:
+                    cursor = self._prepared_cursor(conn, query)
+                    cursor.execute(query, params)
+                else:
+                    cursor = conn.cursor()
+                    cursor.execute(query)
+                
+                if fetch_tuples:
+                    results = cursor.fetchall()
+                else:
+                    # Get column names
+                    columns = [column[0] for column in cursor.description]
+                    
+                    # Fetch all results
+                    results = []
+                    for row in cursor.fetchall():
+                        results.append(dict(zip(columns, row)))
+                
+                self.logger.info(f"Query executed successfully, returned {len(results)} rows")
+                return results
+                
+        except Exception as e:
+            self.logger.error(f"Query execution error: {str(e)}")
+            raise
     
-    def execute_query(self, query: str, params: tuple = None) -> List[Dict[str, Any]]:
-        """Execute SELECT query and return results as list of dictionaries"""
+    def execute_query_iter(self, query: str, params: tuple = None,
+                           arraysize: int = 50000) -> Iterator[Dict[str, List[Any]]]:
+        """Execute SELECT query and yield results in chunks of column value lists"""
         try:
             with self.get_connection() as conn:
                 cursor = conn.cursor()
@@ -67,13 +199,56 @@ class DatabaseManager:
                 # Get column names
                 columns = [column[0] for column in cursor.description]
                 
-                # Fetch all results
-                results = []
-                for row in cursor.fetchall():
-                    results.append(dict(zip(columns, row)))
+                # Only one chunk of driver rows is alive at a time
+                total_rows = 0
+                while True:
+                    rows = cursor.fetchmany(arraysize)
+                    if not rows:
+                        break
+                    total_rows += len(rows)
+                    yield dict(zip(columns, map(list, zip(*rows))))
                 
-                self.logger.info(f"Query executed successfully, returned {len(results)} rows")
-                return results
+                self.logger.info(f"Query streamed successfully, returned {total_rows} rows")
+                
+        except Exception as e:
+            self.logger.error(f"Query execution error: {str(e)}")
+            raise
+    
+    def execute_query_rows(self, query: str, params: tuple = None, arraysize: int = 1000,
+                           fetch_tuples: bool = False) -> Iterator[Union[Dict[str, Any], Any]]:
+        """Execute SELECT query and yield results one row dictionary (or driver row) at a time"""
+        try:
+            with self.get_connection() as conn:
+                cursor = self._prepared_cursor(conn, query) if params else conn.cursor()
+                exhausted = False
+                try:
+                    if params:
+                        cursor.execute(query, params)
+                    else:
+                        cursor.execute(query)
+                    
+                    # Get column names
+                    columns = [column[0] for column in cursor.description]
+                    
+                    # Rows are fetched in batches but never all held at once
+                    total_rows = 0
+                    while True:
+                        rows = cursor.fetchmany(arraysize)
+                        if not rows:
+                            break
+                        total_rows += len(rows)
+                        if fetch_tuples:
+                            yield from rows
+                        else:
+                            for row in rows:
+                                yield dict(zip(columns, row))
+                    
+                    self.logger.info(f"Query streamed successfully, returned {total_rows} rows")
+                    exhausted = True
+                finally:
+                    # Keep a prepared cursor only once its results are fully read
+                    if not (params and exhausted):
+                        self._discard_cursor(conn, query, cursor)
                 
         except Exception as e:
             self.logger.error(f"Query execution error: {str(e)}")
@@ -122,29 +297,85 @@ class DatabaseManager:
     def bulk_insert_dataframe(self, df: pd.DataFrame, table_name: str, schema: str = 'dbo') -> bool:
         """Insert pandas DataFrame into database table"""
         try:
-            with self.get_connection() as conn:
-                # Create the full table name
-                full_table_name = f"{schema}.{table_name}"
-                
-                # Insert data using pandas to_sql method with pyodbc
-                df.to_sql(
-                    name=table_name,
-                    con=conn,
-                    schema=schema,
-                    if_exists='append',
-                    index=False,
-                    method='multi'
-                )
-                
-                self.logger.info(f"Bulk insert completed for {full_table_name}, {len(df)} rows inserted")
-                return True
-                
+            # Create the full table name
+            full_table_name = f"{schema}.{table_name}"
+            
+            # Insert through the engine so each chunk is one fast_executemany batch
+            df.to_sql(
+                name=table_name,
+                con=self.engine,
+                schema=schema,
+                if_exists='append',
+                index=False,
+                chunksize=10_000
+            )
+            
+            self.logger.info(f"Bulk insert completed for {full_table_name}, {len(df)} rows inserted")
+            return True
+            
         except Exception as e:
             self.logger.error(f"Bulk insert error: {str(e)}")
             raise
     
+    def bulk_copy_dataframe(self, df: pd.DataFrame, table_name: str, schema: str = 'dbo') -> bool:
+        """Insert pandas DataFrame using the TDS bulk-load protocol for large frames"""
+        if not BULKCOPY_AVAILABLE or len(df) < BULKCOPY_MIN_ROWS:
+            return self.bulk_insert_dataframe(df, table_name, schema)
+        
+        try:
+            # Create the full table name
+            full_table_name = f"{schema}.{table_name}"
+            
+            # Bulk copy sends a binary row layout: text as str, timestamps as datetime64[ns]
+            coerced = {}
+            for column, dtype in df.dtypes.items():
+                if dtype == object:
+                    coerced[column] = 'string'
+                elif pd.api.types.is_datetime64_dtype(dtype):
+                    coerced[column] = 'datetime64[ns]'
+            if coerced:
+                df = df.astype(coerced)
+            
+            df.to_sql(
+                name=table_name,
+                con=self.engine,
+                schema=schema,
+                if_exists='append',
+                index=False,
+                method=bulkcopy_insert_method
+            )
+            
+            self.logger.info(f"Bulk copy completed for {full_table_name}, {len(df)} rows inserted")
+            return True
+            
+        except Exception as e:
+            self.logger.error(f"Bulk copy error: {str(e)}")
+            raise
+    
     def get_table_row_count(self, table_name: str, schema: str = 'dbo') -> int:
         """Get row count for a specific table"""
+        return self.get_table_row_count_exact(table_name, schema)
+    
+    def get_table_row_count_estimate(self, table_name: str, schema: str = 'dbo') -> int:
+        """Get row count for a table from partition metadata instead of scanning it"""
+        try:
+            query = """
+            SELECT SUM(rows) AS row_count
+            FROM sys.partitions
+            WHERE object_id = OBJECT_ID(?) AND index_id IN (0, 1)
+            """
+            result = self.execute_query(query, (f"{schema}.{table_name}",))
+            if result and result[0]['row_count'] is not None:
+                return int(result[0]['row_count'])
+            
+            # OBJECT_ID is NULL without VIEW DEFINITION on the table, so count it instead
+            return self.get_table_row_count_exact(table_name, schema)
+        except Exception as e:
+            self.logger.error(f"Error estimating row count for {schema}.{table_name}: {str(e)}")
+            return 0
+    
+    def get_table_row_count_exact(self, table_name: str, schema: str = 'dbo') -> int:
+        """Get exact row count for a specific table with COUNT(*)"""
         try:
             query = f"SELECT COUNT(*) as row_count FROM {schema}.{table_name}"
             result = self.execute_query(query)
@@ -155,6 +386,10 @@ class DatabaseManager:
     
     def get_table_info(self, schema: str = None) -> List[Dict[str, Any]]:
         """Get information about tables in the database"""
+        cached = self._cached_metadata(('table_info', schema))
+        if cached is not None:
+            return cached
+        
         try:
             query = """
             SELECT 
@@ -170,7 +405,9 @@ class DatabaseManager:
             
             query += " ORDER BY TABLE_SCHEMA, TABLE_NAME"
             
-            return self.execute_query(query)
+            results = self.execute_query(query)
+            self._meta_cache[('table_info', schema)] = (time.monotonic(), results)
+            return list(results)
         except Exception as e:
             self.logger.error(f"Error getting table info: {str(e)}")
             return []
@@ -194,6 +431,10 @@ class DatabaseManager:
     
     def get_schema_list(self) -> List[str]:
         """Get list of all schemas in the database"""
+        cached = self._cached_metadata(('schemas',))
+        if cached is not None:
+            return cached
+        
         try:
             query = """
             SELECT DISTINCT SCHEMA_NAME 
@@ -202,10 +443,20 @@ class DatabaseManager:
             ORDER BY SCHEMA_NAME
             """
             results = self.execute_query(query)
-            return [row['SCHEMA_NAME'] for row in results]
+            schemas = [row['SCHEMA_NAME'] for row in results]
+            self._meta_cache[('schemas',)] = (time.monotonic(), schemas)
+            return list(schemas)
         except Exception as e:
             self.logger.error(f"Error getting schema list: {str(e)}")
             return []
 
-# Global database manager instance
-db_manager = DatabaseManager()
\ No newline at end of file
+# Global database manager instance, created on first access
+_db_manager = None
+
+def __getattr__(name):
+    global _db_manager
+    if name == 'db_manager':
+        if _db_manager is None:
+            _db_manager = DatabaseManager()
+        return _db_manager
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
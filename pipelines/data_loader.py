@@ -5,13 +5,53 @@ Handles data loading operations for the ETL pipeline.
 """
 
 import os
+import queue
+import threading
 import pandas as pd
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 from config.config import config_manager
 from config.database import db_manager
 
+try:
+    import pyarrow as pa
+    from pyarrow import csv as pacsv
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+# Column types for each source file, so the CSV parser never has to infer them.
+# Nullable Int32 covers integer columns with blanks; category suits low-cardinality codes.
+SOURCE_DTYPES = {
+    'cust_info.csv': {
+        'cst_id': 'Int32', 'cst_key': 'string', 'cst_firstname': 'string',
+        'cst_lastname': 'string', 'cst_marital_status': 'category', 'cst_gndr': 'category',
+        'cst_create_date': 'string'
+    },
+    'prd_info.csv': {
+        'prd_id': 'int32', 'prd_key': 'string', 'prd_nm': 'string', 'prd_cost': 'Int32',
+        'prd_line': 'category', 'prd_start_dt': 'string', 'prd_end_dt': 'string'
+    },
+    'sales_details.csv': {
+        'sls_ord_num': 'string', 'sls_prd_key': 'category', 'sls_cust_id': 'int32',
+        'sls_order_dt': 'int32', 'sls_ship_dt': 'int32', 'sls_due_dt': 'int32',
+        'sls_sales': 'Int32', 'sls_quantity': 'int32', 'sls_price': 'Int32'
+    },
+    'CUST_AZ12.csv': {'CID': 'string', 'BDATE': 'string', 'GEN': 'category'},
+    'LOC_A101.csv': {'CID': 'string', 'CNTRY': 'category'},
+    'PX_CAT_G1V2.csv': {'ID': 'string', 'CAT': 'category', 'SUBCAT': 'string', 'MAINTENANCE': 'category'}
+}
+
+if PYARROW_AVAILABLE:
+    _ARROW_CSV_TYPES = {
+        'string': pa.string(),
+        'int32': pa.int32(),
+        'Int32': pa.int32(),
+        'category': pa.dictionary(pa.int32(), pa.string())
+    }
+
 class DataLoader:
     """Handles data loading operations"""
     
@@ -25,14 +65,40 @@ class DataLoader:
         self.crm_path = data_sources.get('crm_path', 'datasets/source_crm/')
         self.erp_path = data_sources.get('erp_path', 'datasets/source_erp/')
     
-    def load_csv_file(self, file_path: str, encoding: str = 'utf-8') -> Optional[pd.DataFrame]:
-        """Load CSV file into pandas DataFrame"""
+    def load_csv_file(self, file_path: str, encoding: str = 'utf-8', dtype: Dict[str, str] = None,
+                      usecols: List[str] = None) -> Optional[pd.DataFrame]:
+        """Load CSV file into pandas DataFrame, optionally with fixed column types and a column subset"""
         try:
             if not os.path.exists(file_path):
                 self.logger.error(f"File not found: {file_path}")
                 return None
             
-            df = pd.read_csv(file_path, encoding=encoding)
+            df = None
+            if PYARROW_AVAILABLE:
+                try:
+                    # Arrow parses blocks on multiple threads without holding the GIL
+                    table = pacsv.read_csv(
+                        file_path,
+                        read_options=pacsv.ReadOptions(encoding=encoding, block_size=8 << 20),
+                        convert_options=pacsv.ConvertOptions(
+                            strings_can_be_null=True,
+                            column_types={column: _ARROW_CSV_TYPES[t] for column, t in (dtype or {}).items()
+                                          if t in _ARROW_CSV_TYPES},
+                            include_columns=list(usecols) if usecols else None
+                        )
+                    )
+                    df = table.to_pandas(self_destruct=True)
+                    del table
+                    if dtype:
+                        df = df.astype({column: t for column, t in dtype.items() if column in df.columns})
+                except pa.ArrowInvalid as e:
+                    self.logger.debug(f"Arrow could not parse {file_path}, using pandas: {str(e)}")
+            
+            if df is None:
+                df = pd.read_csv(file_path, encoding=encoding, dtype=dtype, usecols=usecols)
+                if usecols:
+                    # Match Arrow, which returns the columns in usecols order
+                    df = df[list(usecols)]
             self.logger.info(f"Loaded {len(df)} rows from {file_path}")
             return df
             
@@ -40,6 +106,61 @@ class DataLoader:
             self.logger.error(f"Error loading CSV file {file_path}: {str(e)}")
             return None
     
+    def stream_csv_to_table(self, file_path: str, table_name: str, schema: str = 'dbo',
+                            encoding: str = 'utf-8', chunksize: int = 100_000) -> bool:
+        """Parse a CSV in chunks and bulk insert each chunk while the next one is parsed"""
+        if not os.path.exists(file_path):
+            self.logger.error(f"File not found: {file_path}")
+            return False
+        
+        # At most two parsed chunks wait for the insert worker at any time
+        chunks = queue.Queue(maxsize=2)
+        errors = []
+        
+        def insert_worker():
+            while True:
+                chunk = chunks.get()
+                if chunk is None:
+                    return
+                if not errors:
+                    try:
+                        self.db.bulk_insert_dataframe(chunk, table_name, schema)
+                    except Exception as e:
+                        errors.append(e)
+                del chunk
+        
+        worker = threading.Thread(target=insert_worker, name=f"insert-{table_name}", daemon=True)
+        worker.start()
+        
+        # Declared types keep every chunk's dtypes identical, blanks or not. Categories
+        # would differ from chunk to chunk, so those columns are read as plain strings.
+        dtype = SOURCE_DTYPES.get(Path(file_path).name)
+        if dtype:
+            dtype = {column: 'string' if t == 'category' else t for column, t in dtype.items()}
+        
+        total_rows = 0
+        try:
+            with pd.read_csv(file_path, encoding=encoding, chunksize=chunksize, engine='c',
+                             dtype=dtype) as reader:
+                for chunk in reader:
+                    if errors:
+                        break
+                    total_rows += len(chunk)
+                    chunks.put(chunk)
+                    del chunk
+        except Exception as e:
+            errors.append(e)
+        finally:
+            chunks.put(None)
+            worker.join()
+        
+        if errors:
+            self.logger.error(f"Error streaming {file_path} into {schema}.{table_name}: {str(errors[0])}")
+            return False
+        
+        self.logger.info(f"Streamed {total_rows} rows from {file_path} into {schema}.{table_name}")
+        return True
+    
     def get_crm_files(self) -> Dict[str, str]:
         """Get CRM data file paths"""
         base_path = Path(self.crm_path)
@@ -58,35 +179,43 @@ class DataLoader:
             'categories': str(base_path / 'PX_CAT_G1V2.csv')
         }
     
-    def load_crm_data(self) -> Dict[str, pd.DataFrame]:
-        """Load all CRM data files"""
-        crm_files = self.get_crm_files()
-        crm_data = {}
+    def _load_files(self, files: Dict[Tuple[str, str], str]) -> Dict[Tuple[str, str], pd.DataFrame]:
+        """Load (source, data_type) -> path files concurrently"""
+        with ThreadPoolExecutor(max_workers=max(len(files), 1)) as executor:
+            futures = {key: executor.submit(self.load_csv_file, file_path,
+                                            dtype=SOURCE_DTYPES.get(Path(file_path).name))
+                       for key, file_path in files.items()}
         
-        for data_type, file_path in crm_files.items():
-            df = self.load_csv_file(file_path)
+        loaded = {}
+        for (source, data_type), future in futures.items():
+            df = future.result()
             if df is not None:
-                crm_data[data_type] = df
-                self.logger.info(f"CRM {data_type} loaded: {len(df)} rows")
+                loaded[(source, data_type)] = df
+                self.logger.info(f"{source} {data_type} loaded: {len(df)} rows")
             else:
-                self.logger.warning(f"Failed to load CRM {data_type} from {file_path}")
+                self.logger.warning(f"Failed to load {source} {data_type} from {files[(source, data_type)]}")
         
-        return crm_data
+        return loaded
+    
+    def load_crm_data(self) -> Dict[str, pd.DataFrame]:
+        """Load all CRM data files"""
+        crm_files = {('CRM', data_type): file_path for data_type, file_path in self.get_crm_files().items()}
+        return {data_type: df for (_, data_type), df in self._load_files(crm_files).items()}
     
     def load_erp_data(self) -> Dict[str, pd.DataFrame]:
         """Load all ERP data files"""
-        erp_files = self.get_erp_files()
-        erp_data = {}
-        
-        for data_type, file_path in erp_files.items():
-            df = self.load_csv_file(file_path)
-            if df is not None:
-                erp_data[data_type] = df
-                self.logger.info(f"ERP {data_type} loaded: {len(df)} rows")
-            else:
-                self.logger.warning(f"Failed to load ERP {data_type} from {file_path}")
+        erp_files = {('ERP', data_type): file_path for data_type, file_path in self.get_erp_files().items()}
+        return {data_type: df for (_, data_type), df in self._load_files(erp_files).items()}
+    
+    def load_all_sources(self) -> Dict[str, Dict[str, pd.DataFrame]]:
+        """Load CRM and ERP data files together, keyed by 'crm' and 'erp'"""
+        files = {('CRM', data_type): file_path for data_type, file_path in self.get_crm_files().items()}
+        files.update({('ERP', data_type): file_path for data_type, file_path in self.get_erp_files().items()})
         
-        return erp_data
+        data = {'crm': {}, 'erp': {}}
+        for (source, data_type), df in self._load_files(files).items():
+            data[source.lower()][data_type] = df
+        return data
     
     def validate_file_structure(self, df: pd.DataFrame, expected_columns: List[str], file_name: str) -> bool:
         """Validate that DataFrame has expected column structure"""
@@ -117,15 +246,19 @@ class DataLoader:
                 return {"exists": False}
             
             file_stat = os.stat(file_path)
-            df = pd.read_csv(file_path, nrows=1)  # Just read header
+            
+            # Just read the header line; no need for the CSV parser
+            with open(file_path, 'rb') as f:
+                header = f.readline()
+            columns = header.rstrip(b'\r\n').decode('utf-8-sig').split(',') if header.strip() else []
             
             return {
                 "exists": True,
                 "size_bytes": file_stat.st_size,
                 "size_mb": round(file_stat.st_size / (1024 * 1024), 2),
                 "modified_time": file_stat.st_mtime,
-                "columns": list(df.columns),
-                "column_count": len(df.columns)
+                "columns": columns,
+                "column_count": len(columns)
             }
             
         except Exception as e:
@@ -148,14 +281,15 @@ class DataLoader:
             "erp_files": {}
         }
         
-        # CRM files info
-        crm_files = self.get_crm_files()
-        for data_type, file_path in crm_files.items():
-            info["crm_files"][data_type] = self.get_file_info(file_path)
+        files = [("crm_files", data_type, file_path) for data_type, file_path in self.get_crm_files().items()]
+        files += [("erp_files", data_type, file_path) for data_type, file_path in self.get_erp_files().items()]
+        
+        # Stat and header reads are I/O bound, so overlap them
+        with ThreadPoolExecutor(max_workers=len(files)) as executor:
+            futures = [(bucket, data_type, executor.submit(self.get_file_info, file_path))
+                       for bucket, data_type, file_path in files]
         
-        # ERP files info
-        erp_files = self.get_erp_files()
-        for data_type, file_path in erp_files.items():
-            info["erp_files"][data_type] = self.get_file_info(file_path)
+        for bucket, data_type, future in futures:
+            info[bucket][data_type] = future.result()
         
         return info
\ No newline at end of file
@@ -56,7 +56,7 @@ class DataValidator:
         ]
         
         for table in bronze_tables:
-            row_count = self.db.get_table_row_count(table, "bronze")
+            row_count = self.db.get_table_row_count_estimate(table, "bronze")
             
             # Basic completeness check
             if row_count > 0:
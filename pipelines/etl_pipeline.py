@@ -144,7 +144,7 @@ class ETLPipeline:
                 
                 total_rows = 0
                 for table in bronze_tables:
-                    count = self.db.get_table_row_count(table, "bronze")
+                    count = self.db.get_table_row_count_estimate(table, "bronze")
                     total_rows += count
                     self.logger.info(f"bronze.{table}: {count:,} rows")
                 
@@ -187,7 +187,7 @@ class ETLPipeline:
                 
                 total_rows = 0
                 for table in silver_tables:
-                    count = self.db.get_table_row_count(table, "silver")
+                    count = self.db.get_table_row_count_estimate(table, "silver")
                     total_rows += count
                     self.logger.info(f"silver.{table}: {count:,} rows")
                 
@@ -28,6 +28,7 @@ SELECT
     ci.cst_key                         AS customer_number,
     ci.cst_firstname                   AS first_name,
     ci.cst_lastname                    AS last_name,
+    CONCAT(ci.cst_firstname, ' ', ci.cst_lastname) AS full_name, -- NULL-safe display name
     la.cntry                           AS country,
     ci.cst_marital_status              AS marital_status,
     CASE 
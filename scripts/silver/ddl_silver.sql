@@ -60,6 +60,17 @@ CREATE TABLE silver.crm_sales_details (
 );
 GO
 
+-- Covering index for date-filtered reads through gold.fact_sales
+CREATE NONCLUSTERED INDEX ix_crm_sales_details_order_dt
+    ON silver.crm_sales_details (sls_order_dt)
+    INCLUDE (sls_sales, sls_quantity, sls_cust_id, sls_prd_key);
+GO
+
+-- Columnstore copy of the measures so full-history aggregates run in batch mode
+CREATE NONCLUSTERED COLUMNSTORE INDEX ncci_crm_sales_details
+    ON silver.crm_sales_details (sls_order_dt, sls_cust_id, sls_prd_key, sls_sales, sls_quantity);
+GO
+
 IF OBJECT_ID('silver.erp_loc_a101', 'U') IS NOT NULL
     DROP TABLE silver.erp_loc_a101;
 GO
@@ -0,0 +1,10 @@
+"""
+Modern Data Warehouse - Test Configuration
+==========================================
+Makes the repository packages importable when pytest runs from any directory.
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
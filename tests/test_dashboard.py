@@ -0,0 +1,113 @@
+"""
+Modern Data Warehouse - Data Quality Dashboard Tests
+====================================================
+Tests for the materialized dashboard summary.
+"""
+
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from monitoring.dashboard import DataQualityDashboard, SUMMARY_WINDOW_DAYS
+
+
+@pytest.fixture
+def dashboard(tmp_path):
+    dashboard = DataQualityDashboard(db_path=str(tmp_path / "quality_metrics.db"))
+    yield dashboard
+    dashboard.close()
+
+
+def _backdate(dashboard, run_id, days):
+    """Move a run's created_at into the past, as if time had passed since it was stored"""
+    with dashboard._transaction() as conn:
+        conn.execute(
+            "UPDATE pipeline_runs SET created_at = datetime('now', ?) WHERE id = ?",
+            (f"-{days} days", run_id)
+        )
+
+
+def test_summary_drops_runs_older_than_window(dashboard):
+    old_run = dashboard.store_pipeline_run({'status': 'COMPLETED', 'data_quality_score': 0.5})
+    dashboard.store_pipeline_run({'status': 'FAILED', 'data_quality_score': 0.9})
+    
+    summary = dashboard._get_summary_stats()
+    assert summary['success_rate'] == 50.0
+    assert summary['avg_quality_score'] == 70.0
+    
+    # No run is written after the old one leaves the window
+    _backdate(dashboard, old_run, SUMMARY_WINDOW_DAYS + 1)
+    
+    summary = dashboard._get_summary_stats()
+    assert summary['total_runs'] == 2
+    assert summary['success_rate'] == 0.0
+    assert summary['avg_quality_score'] == 90.0
+
+
+def test_summary_window_empties_when_every_run_ages_out(dashboard):
+    run_id = dashboard.store_pipeline_run({'status': 'COMPLETED', 'data_quality_score': 0.8})
+    _backdate(dashboard, run_id, SUMMARY_WINDOW_DAYS + 1)
+    
+    summary = dashboard._get_summary_stats()
+    assert summary['total_runs'] == 1
+    assert summary['success_rate'] == 0
+    assert summary['avg_quality_score'] == 0
+    assert summary['latest_status'] == 'COMPLETED'
+
+
+def test_summary_counts_new_runs_after_window_slides(dashboard):
+    old_run = dashboard.store_pipeline_run({'status': 'FAILED', 'data_quality_score': 0.2})
+    _backdate(dashboard, old_run, SUMMARY_WINDOW_DAYS + 1)
+    dashboard.store_pipeline_run({'status': 'COMPLETED', 'data_quality_score': 1.0})
+    
+    summary = dashboard._get_summary_stats()
+    assert summary['total_runs'] == 2
+    assert summary['success_rate'] == 100.0
+    assert summary['avg_quality_score'] == 100.0
+
+
+def test_chart_reflects_runs_stored_by_another_process(tmp_path):
+    pytest.importorskip("flask")
+    db_path = str(tmp_path / "quality_metrics.db")
+    server = DataQualityDashboard(db_path=db_path)
+    writer = DataQualityDashboard(db_path=db_path)
+    try:
+        client = server.app.test_client()
+        
+        run_id = writer.store_pipeline_run({'status': 'COMPLETED', 'data_quality_score': 0.9})
+        writer.store_table_metrics(run_id, {'bronze': {'crm_cust_info': 100}})
+        assert b'100' in client.get('/api/table-size-chart').data
+        
+        # The run row and its table metrics are committed separately
+        run_id = writer.store_pipeline_run({'status': 'COMPLETED', 'data_quality_score': 0.9})
+        assert b'100' in client.get('/api/table-size-chart').data
+        writer.store_table_metrics(run_id, {'bronze': {'crm_cust_info': 250}})
+        assert b'250' in client.get('/api/table-size-chart').data
+    finally:
+        writer.close()
+        server.close()
+
+
+def test_metrics_store_works_without_web_dependencies(tmp_path):
+    # A fresh interpreter where the optional report and web packages cannot be imported
+    script = f"""
+import sys
+for name in ('jinja2', 'flask', 'plotly'):
+    sys.modules[name] = None
+from monitoring.dashboard import DataQualityDashboard
+dashboard = DataQualityDashboard(db_path={str(tmp_path / "quality_metrics.db")!r})
+dashboard.store_pipeline_run({{'status': 'COMPLETED'}})
+assert dashboard._get_summary_stats()['total_runs'] == 1
+try:
+    dashboard.generate_html_report({str(tmp_path / "report.html")!r})
+except ImportError as e:
+    assert 'jinja2' in str(e)
+else:
+    raise AssertionError('report generated without jinja2')
+dashboard.close()
+"""
+    result = subprocess.run([sys.executable, "-c", script], cwd=str(Path(__file__).resolve().parent.parent),
+                            capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr